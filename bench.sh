@@ -0,0 +1 @@
+python3 bench/bench_pipeline.py "$@"
@@ -0,0 +1,69 @@
+import json
+import sys
+import tracemalloc
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+from textnode import TextNode, TextType
+from htmlnode import LeafNode, ParentNode
+
+# Dict-backed copies of the node classes, as they were before __slots__, used as the baseline
+class PlainTextNode():
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class PlainHTMLNode():
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def measure(build, count):
+    tracemalloc.start()
+    nodes = build(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del nodes
+    return current
+
+
+def build_text_nodes(cls):
+    return lambda count: [cls("word", TextType.NORMAL) for _ in range(count)]
+
+
+def build_html_tree(leaf, parent):
+    def build(count):
+        return parent("div", [parent("p", [leaf(None, "word"), leaf("b", "bold")]) for _ in range(count // 3)])
+    return build
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    results = []
+    cases = [
+        ("text_nodes", build_text_nodes(TextNode), build_text_nodes(PlainTextNode)),
+        ("html_tree", build_html_tree(LeafNode, ParentNode), build_html_tree(
+            lambda tag, value, props=None: PlainHTMLNode(tag, value, props=props),
+            lambda tag, children, props=None: PlainHTMLNode(tag, children=children, props=props),
+        )),
+    ]
+    for name, slotted, plain in cases:
+        slotted_bytes = measure(slotted, count)
+        plain_bytes = measure(plain, count)
+        results.append({
+            "name": name,
+            "nodes": count,
+            "slotted_bytes": slotted_bytes,
+            "plain_bytes": plain_bytes,
+            "reduction": round(1 - slotted_bytes / plain_bytes, 3),
+        })
+    print(json.dumps(results, indent=1))
+
+
+if __name__ == "__main__":
+    main()
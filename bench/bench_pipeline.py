@@ -0,0 +1,126 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+from corpus import SHAPES, generate_markdown, write_site
+from blocknode import BlockType
+from usecases import markdown_to_blocks, block_to_block_type, text_to_textnodes, markdown_to_html_node
+import main as site
+
+
+def time_stage(name, func, repeat, size):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "stage": name,
+        "runs": repeat,
+        "best_s": round(best, 6),
+        "mean_s": round(sum(timings) / len(timings), 6),
+        "bytes": size,
+        "mb_per_s": round(size / best / 1e6, 3) if best > 0 else None,
+    }
+
+
+def bench_pipeline(markdown, repeat):
+    size = len(markdown.encode())
+    blocks = markdown_to_blocks(markdown)
+    typed_blocks = [(block_to_block_type(block), block) for block in blocks]
+    inline_texts = [block.replace("\n", " ") for block_type, block in typed_blocks if block_type == BlockType.PARAGRAPH]
+    html_node = markdown_to_html_node(markdown)
+    return [
+        time_stage("markdown_to_blocks", lambda: markdown_to_blocks(markdown), repeat, size),
+        time_stage("block_to_block_type", lambda: [block_to_block_type(block) for block in blocks], repeat, size),
+        time_stage("text_to_textnodes", lambda: [text_to_textnodes(text) for text in inline_texts], repeat, sum(len(text) for text in inline_texts)),
+        time_stage("markdown_to_html_node", lambda: markdown_to_html_node(markdown), repeat, size),
+        time_stage("to_html", lambda: html_node.to_html(), repeat, size),
+    ]
+
+
+def bench_build(pages, blocks, shape, repeat, build_args):
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, pages, blocks, shape)
+        size = 0
+        for directory, _, names in os.walk(path.join(root, "content")):
+            size += sum(path.getsize(path.join(directory, name)) for name in names)
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = time_stage("main", lambda: site.main(["/"] + build_args), repeat, size)
+        finally:
+            os.chdir(cwd)
+    result["pages"] = pages
+    result["args"] = build_args
+    return result
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, 'r') as baseline_file:
+        baseline = {entry["stage"]: entry for entry in json.load(baseline_file)["results"]}
+    regressions = []
+    for entry in results:
+        previous = baseline.get(entry["stage"])
+        if previous is None or previous["best_s"] == 0:
+            continue
+        ratio = entry["best_s"] / previous["best_s"]
+        entry["baseline_ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(entry["stage"])
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the markdown to HTML pipeline")
+    parser.add_argument("--shape", choices=SHAPES, default="mixed")
+    parser.add_argument("--blocks", type=int, default=400, help="blocks in the synthetic document")
+    parser.add_argument("--pages", type=int, default=100, help="pages in the synthetic site used for the full build")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--build-args", default="", help="extra arguments passed to main(), e.g. \"--jobs 4\"")
+    parser.add_argument("--skip-build", action="store_true")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown against the baseline before failing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    markdown = generate_markdown(args.blocks, args.shape)
+    results = bench_pipeline(markdown, args.repeat)
+    if not args.skip_build:
+        results.append(bench_build(args.pages, max(1, args.blocks // 10), args.shape, args.repeat, args.build_args.split()))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "shape": args.shape,
+        "blocks": args.blocks,
+        "results": results,
+    }
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    report["regressions"] = regressions
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+    if regressions:
+        print(f"Performance regressions in: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from os import path
+
+SRC_DIR = path.join(path.dirname(path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from corpus import write_site
+from bench_pipeline import compare
+
+
+def time_command(name, command, repeat, cwd=None):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return {
+        "stage": name,
+        "runs": repeat,
+        "best_s": round(min(timings), 6),
+        "mean_s": round(sum(timings) / len(timings), 6),
+    }
+
+
+def import_breakdown(limit):
+    # -X importtime reports cumulative microseconds per module on stderr
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], env=env, check=True, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Direct imports of main are indented by two spaces after the separator's own space
+        if len(name) - len(name.lstrip()) != 3:
+            continue
+        modules.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 3)})
+    modules.sort(key=lambda module: module["cumulative_ms"], reverse=True)
+    return modules[:limit]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark interpreter startup, imports and first-page latency of src/main.py")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--blocks", type=int, default=40, help="blocks in the single page of the tiny site")
+    parser.add_argument("--build-args", default="", help="extra arguments passed to main.py, e.g. \"--incremental\"")
+    parser.add_argument("--imports", type=int, default=10, help="number of slowest direct imports of main to report")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown against the baseline before failing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    main_script = path.join(SRC_DIR, "main.py")
+    results = [
+        time_command("interpreter", [sys.executable, "-c", "pass"], args.repeat),
+        time_command("import_main", [sys.executable, "-c", "import main"], args.repeat),
+    ]
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, 1, args.blocks)
+        results.append(time_command("first_page", [sys.executable, main_script, "/"] + args.build_args.split(), args.repeat, cwd=root))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "imports": import_breakdown(args.imports),
+    }
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    report["regressions"] = regressions
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+    if regressions:
+        print(f"Performance regressions in: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
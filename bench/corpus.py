@@ -0,0 +1,117 @@
+import os
+import random
+from os import path
+
+SHAPES = ("mixed", "paragraphs", "lists", "links", "code")
+
+WORDS = (
+    "hobbit ring shire mordor elf dwarf wizard river mountain forest "
+    "journey fellowship king steward tower road song fire shadow light"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+<head>
+  <title>{{ Title }}</title>
+  <link href="/index.css" rel="stylesheet" />
+</head>
+<body>
+  <article>{{ Content }}</article>
+</body>
+</html>
+"""
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def inline_text(rng, words=40, links=2):
+    parts = []
+    for _ in range(words // 8):
+        parts.append(sentence(rng, 6))
+        roll = rng.random()
+        if roll < 0.2:
+            parts.append(f"**{rng.choice(WORDS)}**")
+        elif roll < 0.4:
+            parts.append(f"_{rng.choice(WORDS)}_")
+        elif roll < 0.5:
+            parts.append(f"`{rng.choice(WORDS)}()`")
+    for i in range(links):
+        if i % 4 == 3:
+            parts.insert(rng.randrange(len(parts) + 1), f"![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)")
+        else:
+            parts.insert(rng.randrange(len(parts) + 1), f"[{rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})")
+    return " ".join(parts)
+
+
+def paragraph_block(rng, long=False):
+    lines = 12 if long else 3
+    return "\n".join(inline_text(rng, 30) for _ in range(lines))
+
+
+def unordered_list_block(rng, items):
+    return "\n".join(f"- {inline_text(rng, 10, 0)}" for _ in range(items))
+
+
+def ordered_list_block(rng, items):
+    return "\n".join(f"{i + 1}. {inline_text(rng, 10, 0)}" for i in range(items))
+
+
+def code_block(rng, lines):
+    body = "\n".join(f"    call_{rng.choice(WORDS)}({i}, _{rng.choice(WORDS)}_)" for i in range(lines))
+    return f"```python\n{body}\n```"
+
+
+def quote_block(rng):
+    return "\n".join(f"> {sentence(rng)}" for _ in range(3))
+
+
+def generate_markdown(blocks=200, shape="mixed", seed=0):
+    if shape not in SHAPES:
+        raise ValueError(f"Unsupported corpus shape {shape}")
+    rng = random.Random(seed)
+    parts = [f"# {sentence(rng, 5)}"]
+    for i in range(blocks):
+        if shape == "paragraphs":
+            parts.append(paragraph_block(rng, long=True))
+        elif shape == "lists":
+            parts.append(ordered_list_block(rng, 50) if i % 2 else unordered_list_block(rng, 50))
+        elif shape == "links":
+            parts.append("\n".join(inline_text(rng, 30, 12) for _ in range(4)))
+        elif shape == "code":
+            parts.append(code_block(rng, 80))
+        else:
+            choice = i % 8
+            if choice == 0:
+                parts.append(f"## {sentence(rng, 4)}")
+            elif choice == 1:
+                parts.append(unordered_list_block(rng, 6))
+            elif choice == 2:
+                parts.append(ordered_list_block(rng, 6))
+            elif choice == 3:
+                parts.append(code_block(rng, 10))
+            elif choice == 4:
+                parts.append(quote_block(rng))
+            else:
+                parts.append(paragraph_block(rng, long=choice == 5))
+    return "\n\n".join(parts) + "\n"
+
+
+def write_site(root, pages=50, blocks=40, shape="mixed", seed=0):
+    content_dir = path.join(root, "content")
+    static_dir = path.join(root, "static")
+    os.makedirs(path.join(static_dir, "images"), exist_ok=True)
+    with open(path.join(static_dir, "index.css"), 'w') as f:
+        f.write("body { margin: 0 auto; max-width: 40em; }\n")
+    for word in WORDS:
+        with open(path.join(static_dir, "images", f"{word}.png"), 'wb') as f:
+            f.write(bytes(1024))
+    with open(path.join(root, "template.html"), 'w') as f:
+        f.write(TEMPLATE)
+    for i in range(pages):
+        page_dir = content_dir if i == 0 else path.join(content_dir, "blog", f"post-{i}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(path.join(page_dir, "index.md"), 'w') as f:
+            f.write(generate_markdown(blocks, shape, seed + i))
+    return root
@@ -0,0 +1,89 @@
+import errno
+import os
+import shutil
+from os import path
+from manifest import hash_file
+from fastio import copy_file
+from buildlog import info
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl request number for FICLONE on Linux (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def list_files(source_dir):
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs.sort()
+        for name in sorted(names):
+            files.append(path.relpath(path.join(root, name), source_dir))
+    return files
+
+
+def is_in_sync(source, destination, source_stat, checksum=False):
+    try:
+        dest_stat = os.stat(destination)
+    except FileNotFoundError:
+        return False
+    if path.samestat(source_stat, dest_stat):
+        return True
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(source) == hash_file(destination)
+    return source_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def reflink_file(source, destination):
+    import fcntl
+    with open(source, 'rb') as source_file, open(destination, 'wb') as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, source_file.fileno())
+    shutil.copystat(source, destination)
+
+
+def place_file(source, destination, link="copy"):
+    if path.lexists(destination):
+        os.remove(destination)
+    if link == "hardlink":
+        try:
+            os.link(source, destination)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+    elif link == "reflink":
+        try:
+            reflink_file(source, destination)
+            return
+        except (OSError, ImportError):
+            if path.exists(destination):
+                os.remove(destination)
+    copy_file(source, destination)
+
+
+def sync_files(source_dir, destination_dir, previous_assets=None, checksum=False, link="copy", on_copy=None):
+    if not path.exists(source_dir):
+        raise FileNotFoundError(f"Source directory {source_dir} does not exist")
+    if link not in LINK_MODES:
+        raise ValueError(f"Unsupported link mode {link}")
+    previous_assets = previous_assets or {}
+    assets = {}
+    for relative in list_files(source_dir):
+        source = path.join(source_dir, relative)
+        destination = path.join(destination_dir, relative)
+        source_stat = os.stat(source)
+        if not is_in_sync(source, destination, source_stat, checksum):
+            info(f"Copying file: {source} -> {destination}")
+            os.makedirs(path.dirname(destination), exist_ok=True)
+            place_file(source, destination, link)
+            if on_copy is not None:
+                on_copy(destination)
+        assets[destination] = {"source": source, "size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns}
+
+    # Only files this sync created earlier are removed, so generated pages in the same tree are left alone
+    for destination in previous_assets:
+        if destination not in assets and path.exists(destination):
+            info(f"Removing stale file: {destination}")
+            os.remove(destination)
+    return assets
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import time
+from os import path
+
+# Blocks shorter than this render faster than a cache round trip
+MIN_BLOCK_SIZE = 256
+
+
+class BlockCache():
+    def __init__(self, db_path, max_bytes=256 * 1024 * 1024, version=1, min_block_size=MIN_BLOCK_SIZE):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.min_block_size = min_block_size
+        self.hits = 0
+        self.misses = 0
+        self.pending = {}
+        self.touched = set()
+        self.connection = None
+        self.pid = None
+
+    def connect(self):
+        # Connections must not cross a fork, so every worker process opens its own
+        if self.connection is None or self.pid != os.getpid():
+            directory = path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Imported here so builds without --block-cache never load sqlite
+            import sqlite3
+            self.connection = sqlite3.connect(self.db_path, timeout=30)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS blocks (key BLOB PRIMARY KEY, html TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS blocks_last_used ON blocks (last_used)")
+            self.pid = os.getpid()
+        return self.connection
+
+    def key(self, block_type, block):
+        return hashlib.sha256(f"{self.version}\0{block_type.value}\0{block}".encode()).digest()
+
+    def cacheable(self, block):
+        return len(block) >= self.min_block_size
+
+    def get(self, block_type, block):
+        key = self.key(block_type, block)
+        html = self.pending.get(key)
+        if html is None:
+            row = self.connect().execute("SELECT html FROM blocks WHERE key = ?", (key,)).fetchone()
+            html = row[0] if row is not None else None
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.touched.add(key)
+        return html
+
+    def put(self, block_type, block, html):
+        self.pending[self.key(block_type, block)] = html
+
+    def flush(self):
+        if not self.pending and not self.touched:
+            return
+        now = time.time()
+        connection = self.connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, html, len(html) + len(key), now) for key, html in self.pending.items()],
+            )
+            connection.executemany("UPDATE blocks SET last_used = ? WHERE key = ?", [(now, key) for key in self.touched])
+        self.pending = {}
+        self.touched = set()
+
+    def evict(self):
+        connection = self.connect()
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        with connection:
+            rows = connection.execute("SELECT key, size FROM blocks ORDER BY last_used").fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                connection.execute("DELETE FROM blocks WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        return evicted
+
+    def close(self):
+        self.flush()
+        self.evict()
+        if self.connection is not None and self.pid == os.getpid():
+            self.connection.close()
+        self.connection = None
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+_active_cache = None
+
+def configure_block_cache(db_path, max_bytes, version):
+    global _active_cache
+    _active_cache = BlockCache(db_path, max_bytes, version) if db_path is not None else None
+    return _active_cache
+
+def active_block_cache():
+    return _active_cache
@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Kept free of site imports so a client call costs little more than interpreter startup
+DEFAULT_SOCKET = os.path.join(".ssg-cache", "daemon.sock")
+
+
+def send_request(socket_path, request, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + "\n").encode())
+        client.shutdown(socket.SHUT_WR)
+        data = b""
+        while True:
+            chunk = client.recv(1 << 16)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+def build_locally(argv):
+    from main import main
+    try:
+        main(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Send requests to a running build daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="path of the daemon's Unix socket")
+    parser.add_argument("--no-fallback", action="store_true", help="fail instead of building in this process when no daemon is running")
+    parser.add_argument("command", choices=("build", "status", "stop"))
+    parser.add_argument("build_args", nargs=argparse.REMAINDER, help="arguments passed on to main.py for build")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    request = {"command": args.command, "args": args.build_args, "cwd": os.getcwd()}
+    try:
+        response = send_request(args.socket, request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if args.command != "build" or args.no_fallback:
+            print(f"No build daemon is listening on {args.socket}", file=sys.stderr)
+            return 1
+        print(f"No build daemon is listening on {args.socket}, building in this process", file=sys.stderr)
+        return build_locally(args.build_args)
+    sys.stdout.write(response.get("output", ""))
+    sys.stdout.flush()
+    return response.get("exit_code", 0 if response.get("ok") else 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
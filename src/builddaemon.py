@@ -0,0 +1,142 @@
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from os import path
+from main import main as build, parse_args as parse_build_args
+from buildclient import DEFAULT_SOCKET
+from buildlog import configure_logging, info, flush
+from output import FileSystemOutput, configure_output
+from template import configure_asset_urls
+from blockcache import configure_block_cache
+
+
+class BuildDaemon():
+    def __init__(self, site_dir, socket_path):
+        self.site_dir = path.realpath(site_dir)
+        self.socket_path = socket_path
+        self.started = time.time()
+        self.builds = 0
+        self.last_build = None
+        self.server = None
+
+    def handle(self, request):
+        command = request.get("command")
+        if command == "build":
+            return self.build(request.get("args", []), request.get("cwd"))
+        if command == "status":
+            return self.status()
+        if command == "stop":
+            # shutdown() waits for serve_forever to return, so it cannot run on the handling thread
+            threading.Thread(target=self.server.shutdown).start()
+            return {"ok": True, "exit_code": 0, "output": "Stopping build daemon\n"}
+        return {"ok": False, "exit_code": 2, "output": f"Unknown command {command}\n"}
+
+    def status(self):
+        output = f"Build daemon {os.getpid()} for {self.site_dir}, up {time.time() - self.started:.0f}s, {self.builds} builds"
+        if self.last_build is not None:
+            output += f", last exited {self.last_build['exit_code']} in {self.last_build['seconds']:.3f}s"
+        return {"ok": True, "exit_code": 0, "output": output + "\n"}
+
+    def build(self, argv, cwd=None):
+        if cwd is not None and path.realpath(cwd) != self.site_dir:
+            return {"ok": False, "exit_code": 2, "output": f"This daemon builds {self.site_dir}, not {cwd}\n"}
+        output = io.StringIO()
+        started = time.perf_counter()
+        exit_code = 0
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                args = parse_build_args(argv)
+                if args.watch or args.serve:
+                    print("The build daemon runs single builds, use main.py directly for --watch and --serve")
+                    exit_code = 2
+                else:
+                    build(argv)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                flush()
+        # The build left its own logger pointing at the captured output, and a failed build may leave its archive output active
+        configure_logging()
+        configure_output(FileSystemOutput())
+        configure_asset_urls(None)
+        configure_block_cache(None, 0, None)
+        seconds = time.perf_counter() - started
+        self.builds += 1
+        self.last_build = {"exit_code": exit_code, "seconds": seconds}
+        info(f"Build {' '.join(argv) or '(defaults)'} exited {exit_code} in {seconds:.3f}s")
+        flush()
+        return {"ok": exit_code == 0, "exit_code": exit_code, "output": output.getvalue(), "seconds": seconds}
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            response = {"ok": False, "exit_code": 2, "output": "Malformed request\n"}
+        else:
+            response = self.server.daemon.handle(request)
+        self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+def is_listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def create_server(daemon):
+    if path.exists(daemon.socket_path):
+        if is_listening(daemon.socket_path):
+            raise RuntimeError(f"A build daemon is already listening on {daemon.socket_path}")
+        # Left behind by a daemon that did not shut down cleanly
+        os.remove(daemon.socket_path)
+    directory = path.dirname(daemon.socket_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # One request at a time, so builds never overlap in the shared output tree
+    server = socketserver.UnixStreamServer(daemon.socket_path, BuildRequestHandler)
+    server.daemon = daemon
+    daemon.server = server
+    return server
+
+
+def serve_daemon(site_dir=".", socket_path=DEFAULT_SOCKET):
+    os.chdir(site_dir)
+    daemon = BuildDaemon(".", socket_path)
+    server = create_server(daemon)
+    info(f"Build daemon {os.getpid()} listening on {socket_path}")
+    flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the site generator loaded and build on request")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="path of the Unix socket to listen on, relative to the site")
+    parser.add_argument("--site-dir", default=".", help="directory holding content, static and template.html")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    serve_daemon(args.site_dir, args.socket)
@@ -0,0 +1,147 @@
+import atexit
+import sys
+import time
+from contextlib import contextmanager
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+
+BAR_WIDTH = 30
+# Redrawing the bar for every file would cost more than the prints it replaces
+REDRAW_INTERVAL = 0.1
+
+
+class BuildLog():
+    def __init__(self, level=INFO, stream=None, progress=False, buffer_size=64 * 1024):
+        self.level = level
+        self.stream = stream if stream is not None else sys.stdout
+        self.progress = progress
+        self.tty = progress and self.stream.isatty()
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered = 0
+        self.task = None
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, message):
+        if level < self.level:
+            return
+        # In progress mode per-file messages inside a task only move the bar
+        if self.task is not None and level <= INFO:
+            if level == INFO:
+                self.advance()
+            return
+        if self.task is not None and self.tty:
+            self.clear_bar()
+        self.buffer.append(message)
+        self.buffered += len(message) + 1
+        if self.buffered >= self.buffer_size or level >= WARNING:
+            self.flush()
+        if self.task is not None and self.tty:
+            self.draw_bar()
+
+    def debug(self, message):
+        self.log(DEBUG, message)
+
+    def info(self, message):
+        self.log(INFO, message)
+
+    def warning(self, message):
+        self.log(WARNING, message)
+
+    def error(self, message):
+        self.log(ERROR, message)
+
+    def flush(self):
+        if self.buffer:
+            self.buffer.append("")
+            self.stream.write("\n".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+        self.stream.flush()
+
+    @contextmanager
+    def progress_task(self, label, total):
+        if not self.progress or self.level > INFO:
+            yield
+            return
+        self.flush()
+        self.task = {"label": label, "total": total, "done": 0, "started": time.perf_counter(), "drawn": 0}
+        try:
+            yield
+        finally:
+            task = self.task
+            self.task = None
+            if self.tty:
+                self.clear_bar()
+            seconds = time.perf_counter() - task["started"]
+            of_total = f" of {task['total']}" if task["total"] is not None else ""
+            self.info(f"{label}: {task['done']}{of_total} in {seconds:.2f}s")
+
+    def advance(self):
+        task = self.task
+        task["done"] += 1
+        if self.tty:
+            now = time.perf_counter()
+            if now - task["drawn"] >= REDRAW_INTERVAL or task["done"] == task["total"]:
+                task["drawn"] = now
+                self.draw_bar()
+
+    def draw_bar(self):
+        task = self.task
+        if task["total"] is None:
+            self.stream.write(f"\r{task['label']} {task['done']}")
+            self.stream.flush()
+            return
+        total = max(task["total"], 1)
+        filled = min(BAR_WIDTH, BAR_WIDTH * task["done"] // total)
+        bar = "#" * filled + "-" * (BAR_WIDTH - filled)
+        self.stream.write(f"\r{task['label']} [{bar}] {task['done']}/{task['total']}")
+        self.stream.flush()
+
+    def clear_bar(self):
+        self.stream.write("\r\033[K")
+
+
+_active_log = BuildLog()
+atexit.register(lambda: _active_log.flush())
+
+
+def configure_logging(level=INFO, progress=False, stream=None):
+    global _active_log
+    _active_log.flush()
+    _active_log = BuildLog(level, stream, progress)
+    return _active_log
+
+
+def active_log():
+    return _active_log
+
+
+def debug(message):
+    _active_log.log(DEBUG, message)
+
+
+def info(message):
+    _active_log.log(INFO, message)
+
+
+def warning(message):
+    _active_log.log(WARNING, message)
+
+
+def error(message):
+    _active_log.log(ERROR, message)
+
+
+def flush():
+    _active_log.flush()
+
+
+def progress_task(label, total):
+    return _active_log.progress_task(label, total)
@@ -0,0 +1,102 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from buildlog import info
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map")
+FORMAT_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+# Below this size the compressed sibling saves less than the extra request overhead
+MIN_SIZE = 256
+
+
+def available_formats():
+    return ("gzip", "br") if brotli is not None else ("gzip",)
+
+
+def compress_bytes(data, format):
+    if format == "gzip":
+        # mtime=0 keeps the output byte-for-byte reproducible between builds
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if format == "br":
+        if brotli is None:
+            raise ValueError("Brotli compression requires the brotli package")
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unsupported compression format {format}")
+
+
+def compress_file(file_path, formats):
+    source_stat = os.stat(file_path)
+    pending = []
+    for format in formats:
+        target = file_path + FORMAT_SUFFIXES[format]
+        try:
+            # Siblings carry the source mtime, so an equal mtime means the source is unchanged
+            if os.stat(target).st_mtime_ns == source_stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        pending.append((format, target))
+    if not pending:
+        return 0
+    with open(file_path, 'rb') as source_file:
+        data = source_file.read()
+    written = 0
+    for format, target in pending:
+        compressed = compress_bytes(data, format)
+        if len(compressed) >= len(data):
+            if path.exists(target):
+                os.remove(target)
+            continue
+        with open(target, 'wb') as target_file:
+            target_file.write(compressed)
+        os.utime(target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        written += 1
+    return written
+
+
+def is_eligible(file_path):
+    return file_path.endswith(COMPRESSIBLE_EXTENSIONS) and path.getsize(file_path) >= MIN_SIZE
+
+
+def find_compressible(root):
+    files = []
+    stale = []
+    suffixes = tuple(FORMAT_SUFFIXES.values())
+    for directory, _, names in os.walk(root):
+        for name in names:
+            file_path = path.join(directory, name)
+            if name.endswith(suffixes):
+                source = path.splitext(file_path)[0]
+                # Only siblings this stage could have written are touched; a shipped data.csv.gz is an asset
+                if source.endswith(COMPRESSIBLE_EXTENSIONS) and (not path.exists(source) or not is_eligible(source)):
+                    stale.append(file_path)
+            elif is_eligible(file_path):
+                files.append(file_path)
+    return sorted(files), stale
+
+
+def validate_formats(formats):
+    for format in formats:
+        if format not in FORMAT_SUFFIXES:
+            raise ValueError(f"Unsupported compression format {format}")
+        if format == "br" and brotli is None:
+            raise ValueError("Brotli compression requires the brotli package")
+    return formats
+
+
+def compress_tree(root, formats=None, threads=None):
+    formats = validate_formats(formats or available_formats())
+    files, stale = find_compressible(root)
+    for sibling in stale:
+        os.remove(sibling)
+    # zlib and brotli release the GIL while compressing, so threads use every core here
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 1) as executor:
+        written = sum(executor.map(lambda file_path: compress_file(file_path, formats), files))
+    info(f"Compressed {written} files ({', '.join(formats)}), removed {len(stale)} stale")
+    return written
@@ -0,0 +1,127 @@
+import json
+from os import path
+from usecases import IMAGE_PATTERN, LINK_PATTERN, scan_blocks, block_lines_to_block_type
+from blocknode import BlockType
+from fastio import read_text, write_atomic
+from buildlog import warning
+
+GRAPH_VERSION = 1
+
+
+def resolve_reference(url, content_dir, static_dir):
+    # Only site-internal absolute URLs map to inputs; external and relative ones are ignored
+    if not url.startswith("/") or url.startswith("//"):
+        return None
+    target = url.split("#")[0].split("?")[0].strip("/")
+    if target == "":
+        return path.join(content_dir, "index.md")
+    root, extension = path.splitext(target)
+    if extension == ".html":
+        return path.join(content_dir, root + ".md")
+    if extension:
+        return path.join(static_dir, target)
+    return path.join(content_dir, target, "index.md")
+
+
+def block_line_numbers(lines, blocks):
+    # Blocks come out in source order with their lines trimmed, so each line is found by walking forward
+    cursor = 0
+    for block in blocks:
+        numbers = []
+        for line in block:
+            while lines[cursor].strip() != line.strip():
+                cursor += 1
+            numbers.append(cursor + 1)
+            cursor += 1
+        yield block, numbers
+
+
+def page_references(from_path):
+    lines = read_text(from_path).split('\n')
+    references = []
+    for block, numbers in block_line_numbers(lines, list(scan_blocks(lines))):
+        # Code samples are rendered verbatim, and whole blocks are scanned so links wrapped over lines are found
+        if block_lines_to_block_type(block) == BlockType.CODE:
+            continue
+        text = '\n'.join(block)
+        if "](" not in text:
+            continue
+        matches = [(match.start(), "image", match.group(2)) for match in IMAGE_PATTERN.finditer(text)]
+        matches.extend((match.start(), "link", match.group(2)) for match in LINK_PATTERN.finditer(text))
+        for start, kind, url in sorted(matches):
+            references.append((kind, url, numbers[text.count('\n', 0, start)]))
+    return references
+
+
+def page_dependencies(from_path, template_path, content_dir, static_dir):
+    inputs = {from_path, template_path}
+    for _, url, _ in page_references(from_path):
+        target = resolve_reference(url, content_dir, static_dir)
+        if target is not None and target != from_path:
+            inputs.add(target)
+    return inputs
+
+
+class DependencyGraph():
+    def __init__(self):
+        self.dependencies = {}
+        self.dependents = {}
+
+    def set_dependencies(self, output, inputs):
+        self.remove_output(output)
+        self.dependencies[output] = set(inputs)
+        for input in inputs:
+            self.dependents.setdefault(input, set()).add(output)
+
+    def remove_output(self, output):
+        for input in self.dependencies.pop(output, ()):
+            outputs = self.dependents.get(input)
+            if outputs is not None:
+                outputs.discard(output)
+                if not outputs:
+                    del self.dependents[input]
+
+    def retain_outputs(self, outputs):
+        for output in [output for output in self.dependencies if output not in outputs]:
+            self.remove_output(output)
+
+    def dependencies_of(self, output):
+        return sorted(self.dependencies.get(output, ()))
+
+    def affected_outputs(self, inputs):
+        affected = set()
+        for input in inputs:
+            affected.update(self.dependents.get(input, ()))
+        return sorted(affected)
+
+    def update_pages(self, pages, template_path, content_dir, static_dir):
+        for from_path, dest_path in pages:
+            self.set_dependencies(dest_path, page_dependencies(from_path, template_path, content_dir, static_dir))
+
+    def to_dict(self):
+        return {
+            "version": GRAPH_VERSION,
+            "outputs": {output: sorted(inputs) for output, inputs in sorted(self.dependencies.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        graph = cls()
+        if isinstance(data, dict) and data.get("version") == GRAPH_VERSION:
+            for output, inputs in data.get("outputs", {}).items():
+                graph.set_dependencies(output, inputs)
+        return graph
+
+    def save(self, graph_path):
+        write_atomic(graph_path, json.dumps(self.to_dict(), indent=1))
+
+    @classmethod
+    def load(cls, graph_path):
+        if not path.exists(graph_path):
+            return cls()
+        try:
+            with open(graph_path, 'r') as graph_file:
+                return cls.from_dict(json.load(graph_file))
+        except (OSError, ValueError):
+            warning(f"Ignoring unreadable dependency graph {graph_path}")
+            return cls()
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from os import path
+from usecases import generate_page
+from manifest import hash_file, page_entry
+from assets import place_file
+from linkcheck import build_output_index, check_links
+from buildlog import info, error, flush
+
+
+def snapshot(root):
+    files = {}
+    if path.isfile(root):
+        stat = os.stat(root)
+        files[root] = (stat.st_mtime_ns, stat.st_size)
+        return files
+    for directory, _, names in os.walk(root):
+        for name in names:
+            file_path = path.join(directory, name)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def diff_snapshots(before, after):
+    changed = [file_path for file_path, state in after.items() if before.get(file_path) != state]
+    removed = [file_path for file_path in before if file_path not in after]
+    return sorted(changed), sorted(removed)
+
+
+def page_dest_path(from_path, content_dir, dest_dir):
+    directory, name = path.split(path.relpath(from_path, content_dir))
+    return path.join(dest_dir, directory, name.replace(".md", ".html"))
+
+
+class SiteWatcher():
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath, manifest, rebuild_all, on_rebuild=None, graph=None, check_links=False):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest = manifest
+        self.rebuild_all = rebuild_all
+        self.on_rebuild = on_rebuild
+        self.graph = graph
+        self.stale_references = []
+        self.check_links = check_links
+        self.broken_links = []
+        self.snapshots = self.take_snapshots()
+
+    def take_snapshots(self):
+        return {root: snapshot(root) for root in (self.content_dir, self.static_dir, self.template_path)}
+
+    def poll(self):
+        current = self.take_snapshots()
+        changes = {root: diff_snapshots(self.snapshots[root], current[root]) for root in current}
+        self.snapshots = current
+        return changes
+
+    def rebuild(self, changes):
+        template_changes = changes[self.template_path]
+        content_changed, content_removed = changes[self.content_dir]
+        static_changed, static_removed = changes[self.static_dir]
+        if template_changes[0] or template_changes[1]:
+            # The template feeds every page, so let the manifest-driven build pick them all up
+            pages, built_pages = self.rebuild_all()
+            self.update_graph(built_pages, pages)
+        else:
+            built_pages = self.rebuild_pages(content_changed, content_removed)
+            self.update_graph(built_pages)
+        self.sync_assets(static_changed, static_removed)
+        if self.graph is not None:
+            # Pages whose referenced pages or assets changed keep their HTML but need re-validating
+            changed_inputs = content_changed + content_removed + static_changed + static_removed
+            rebuilt = set(dest_path for _, dest_path in built_pages)
+            self.stale_references = [output for output in self.graph.affected_outputs(changed_inputs) if output not in rebuilt]
+            if self.stale_references:
+                info(f"Pages referencing changed inputs: {', '.join(self.stale_references)}")
+        if self.check_links:
+            self.recheck_links(built_pages)
+        if self.on_rebuild is not None:
+            self.on_rebuild()
+
+    def recheck_links(self, built_pages):
+        pages = self.manifest["pages"]
+        sources_by_output = {entry["dest_path"]: from_path for from_path, entry in pages.items()}
+        sources = [from_path for from_path, _ in built_pages]
+        sources.extend(sources_by_output[output] for output in self.stale_references if output in sources_by_output)
+        index = build_output_index(self.dest_dir, list(sources_by_output) + list(self.manifest["assets"]))
+        self.broken_links = check_links(sorted(set(sources)), index)
+
+    def update_graph(self, built_pages, pages=None):
+        if self.graph is None:
+            return
+        self.graph.update_pages(built_pages, self.template_path, self.content_dir, self.static_dir)
+        if pages is None:
+            pages = [(from_path, entry["dest_path"]) for from_path, entry in self.manifest["pages"].items()]
+        self.graph.retain_outputs(set(dest_path for _, dest_path in pages))
+
+    def rebuild_pages(self, changed, removed):
+        pages = self.manifest["pages"]
+        template_hash = hash_file(self.template_path) if changed else None
+        built_pages = []
+        for from_path in changed:
+            dest_path = page_dest_path(from_path, self.content_dir, self.dest_dir)
+            try:
+                generate_page(from_path, self.template_path, dest_path, self.basepath)
+            except Exception as e:
+                # Keep the session alive on a broken edit; the next save triggers another attempt
+                error(f"Failed to generate page {from_path}: {e}")
+                pages.pop(from_path, None)
+                continue
+            pages[from_path] = page_entry(from_path, template_hash, self.basepath, dest_path)
+            built_pages.append((from_path, dest_path))
+        for from_path in removed:
+            entry = pages.pop(from_path, None)
+            if entry is not None and path.exists(entry["dest_path"]):
+                info(f"Removing stale page {entry['dest_path']}")
+                os.remove(entry["dest_path"])
+        return built_pages
+
+    def sync_assets(self, changed, removed):
+        assets = self.manifest["assets"]
+        for source in changed:
+            destination = path.join(self.dest_dir, path.relpath(source, self.static_dir))
+            info(f"Copying file: {source} -> {destination}")
+            os.makedirs(path.dirname(destination), exist_ok=True)
+            place_file(source, destination)
+            stat = os.stat(source)
+            assets[destination] = {"source": source, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        for source in removed:
+            destination = path.join(self.dest_dir, path.relpath(source, self.static_dir))
+            if assets.pop(destination, None) is not None and path.exists(destination):
+                info(f"Removing stale file: {destination}")
+                os.remove(destination)
+
+    def watch(self, interval=0.5):
+        info(f"Watching {self.content_dir}, {self.static_dir} and {self.template_path} for changes")
+        while True:
+            flush()
+            time.sleep(interval)
+            changes = self.poll()
+            if not any(changed or removed for changed, removed in changes.values()):
+                continue
+            started = time.perf_counter()
+            try:
+                self.rebuild(changes)
+            except Exception as e:
+                error(f"Rebuild failed: {e}")
+                continue
+            info(f"Rebuilt in {time.perf_counter() - started:.3f}s")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory, port=8888):
+    handler = partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    info(f"Serving {directory} on http://localhost:{server.server_address[1]}/")
+    return server
@@ -0,0 +1,113 @@
+import errno
+import locale
+import mmap
+import os
+import shutil
+
+# Below these sizes the extra syscalls cost more than the copies they avoid
+MMAP_THRESHOLD = 256 * 1024
+KERNEL_COPY_THRESHOLD = 64 * 1024
+# Matches what open() in text mode decodes with, so both read paths give the same text
+SOURCE_ENCODING = locale.getpreferredencoding(False)
+# Raised when a kernel copy path is unavailable for this pair of files rather than failing
+KERNEL_COPY_FALLBACK_ERRNOS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF)
+
+
+def normalize_newlines(text):
+    # Text mode turns \r\n and \r into \n; mapped reads have to do the same
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def read_text(file_path):
+    size = os.path.getsize(file_path)
+    if size < MMAP_THRESHOLD:
+        with open(file_path, 'r') as text_file:
+            return text_file.read()
+    # Decoding straight from the mapping skips the intermediate bytes copy of read()
+    with open(file_path, 'rb') as binary_file, mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        with memoryview(mapping) as view:
+            return normalize_newlines(str(view, SOURCE_ENCODING))
+
+
+def find_line_start(mapping, prefix):
+    if mapping[:len(prefix)] == prefix:
+        return 0
+    starts = [position + 1 for position in (mapping.find(b'\n' + prefix), mapping.find(b'\r' + prefix)) if position >= 0]
+    return min(starts) if starts else -1
+
+
+def read_markdown_title(file_path):
+    if os.path.getsize(file_path) < MMAP_THRESHOLD:
+        with open(file_path, 'r') as markdown_file:
+            for line in markdown_file:
+                if line.startswith('# '):
+                    return line[2:].rstrip('\n')
+        return None
+    # mmap's find scans in C, so a title deep into a huge file costs no per-line Python work
+    with open(file_path, 'rb') as binary_file, mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        start = find_line_start(mapping, b'# ')
+        if start < 0:
+            return None
+        ends = [position for position in (mapping.find(b'\n', start), mapping.find(b'\r', start)) if position >= 0]
+        end = min(ends) if ends else len(mapping)
+        return mapping[start + 2:end].decode(SOURCE_ENCODING)
+
+
+def write_atomic(file_path, text):
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Written to a sibling and renamed over the target, so readers and interrupted builds never see a truncated file
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as tmp_file:
+        tmp_file.write(text)
+    os.replace(tmp_path, file_path)
+
+
+def kernel_copy(source_fd, dest_fd, size):
+    if hasattr(os, "copy_file_range"):
+        try:
+            # Lets the filesystem share extents or copy server side where it can
+            copied = 0
+            while copied < size:
+                count = os.copy_file_range(source_fd, dest_fd, size - copied, copied, copied)
+                if count == 0:
+                    break
+                copied += count
+            # Some filesystems report nothing copied instead of failing, like shutil we take that as unsupported
+            if copied > 0:
+                return True
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_FALLBACK_ERRNOS:
+                raise
+    if hasattr(os, "sendfile"):
+        try:
+            copied = 0
+            while copied < size:
+                count = os.sendfile(dest_fd, source_fd, copied, size - copied)
+                if count == 0:
+                    break
+                copied += count
+            if copied > 0:
+                return True
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_FALLBACK_ERRNOS:
+                raise
+    return False
+
+
+def copy_file(source, destination):
+    size = os.path.getsize(source)
+    if size < KERNEL_COPY_THRESHOLD:
+        shutil.copy2(source, destination)
+        return
+    with open(source, 'rb') as source_file, open(destination, 'wb') as dest_file:
+        if not kernel_copy(source_file.fileno(), dest_file.fileno(), size):
+            # sendfile may have advanced the destination offset before giving up
+            dest_file.seek(0)
+            dest_file.truncate(0)
+            shutil.copyfileobj(source_file, dest_file, 1 << 20)
+    # Keep the mtime like copy2, which is what incremental syncs compare against
+    shutil.copystat(source, destination)
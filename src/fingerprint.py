@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+from os import path
+from manifest import hash_file
+from assets import list_files
+from output import active_output
+from buildlog import info
+
+HASH_LENGTH = 12
+ASSET_MANIFEST_FILE = "asset-manifest.json"
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")\s]+)\1\s*\)""")
+
+
+def fingerprinted_path(relative, digest):
+    root, extension = path.splitext(relative)
+    return f"{root}.{digest[:HASH_LENGTH]}{extension}"
+
+
+def rewrite_css(css, css_url, asset_urls):
+    directory = posixpath.dirname(css_url)
+
+    def replace(match):
+        quote, reference = match.groups()
+        target = re.split(r"[?#]", reference, maxsplit=1)[0]
+        suffix = reference[len(target):]
+        if target.startswith("/") and not target.startswith("//"):
+            fingerprinted = asset_urls.get(target)
+        elif ":" in target or target.startswith("//") or not target:
+            return match.group(0)
+        else:
+            # Relative references resolve against the stylesheet and stay relative
+            fingerprinted = asset_urls.get(posixpath.normpath(posixpath.join(directory, target)))
+            if fingerprinted is not None:
+                fingerprinted = posixpath.relpath(fingerprinted, directory)
+        if fingerprinted is None:
+            return match.group(0)
+        return f"url({quote}{fingerprinted}{suffix}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def fingerprint_assets(source_dir, destination_dir, previous_assets=None, incremental=False, on_copy=None):
+    if not path.exists(source_dir):
+        raise FileNotFoundError(f"Source directory {source_dir} does not exist")
+    output = active_output()
+    previous_by_source = {entry["source"]: entry for entry in (previous_assets or {}).values() if "hash" in entry}
+    # Stylesheets go last: their hash covers the rewritten references, so it depends on every other asset
+    files = sorted(list_files(source_dir), key=lambda relative: relative.endswith(".css"))
+    asset_urls = {}
+    assets = {}
+    for relative in files:
+        source = path.join(source_dir, relative)
+        url = "/" + relative.replace(path.sep, "/")
+        stat = os.stat(source)
+        data = None
+        if relative.endswith(".css"):
+            with open(source, 'r') as css_file:
+                data = rewrite_css(css_file.read(), url, asset_urls).encode()
+            digest = hashlib.sha256(data).hexdigest()
+        else:
+            previous = previous_by_source.get(source)
+            if previous is not None and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+                digest = previous["hash"]
+            else:
+                digest = hash_file(source)
+        fingerprinted = fingerprinted_path(relative, digest)
+        destination = path.join(destination_dir, fingerprinted)
+        asset_urls[url] = "/" + fingerprinted.replace(path.sep, "/")
+        assets[destination] = {"source": source, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+        # The name changes with the content, so an existing file is already up to date
+        if incremental and path.exists(destination):
+            continue
+        info(f"Copying file: {source} -> {destination}")
+        if data is not None:
+            output.write_bytes(destination, data)
+        else:
+            output.copy_file(source, destination)
+        if on_copy is not None:
+            on_copy(destination)
+
+    if incremental:
+        for destination in previous_assets or {}:
+            if destination not in assets and path.exists(destination):
+                info(f"Removing stale file: {destination}")
+                os.remove(destination)
+    asset_manifest = {url[1:]: fingerprinted[1:] for url, fingerprinted in sorted(asset_urls.items())}
+    output.write_bytes(path.join(destination_dir, ASSET_MANIFEST_FILE), (json.dumps(asset_manifest, indent=1) + "\n").encode())
+    return asset_urls, assets
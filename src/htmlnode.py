@@ -1,4 +1,6 @@
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,18 +10,24 @@ class HTMLNode():
     def to_html(self):
         raise NotImplementedError("Method not implemented in superclass")
 
+    def iter_html(self):
+        raise NotImplementedError("Method not implemented in superclass")
+
+    def write_html(self, fp):
+        for chunk in self.iter_html():
+            fp.write(chunk)
+
     def props_to_html(self):
         if self.props is None:
             return ""
-        attributes = ""
-        for key in self.props:
-            attributes += f" {key}=\"{self.props[key]}\""
-        return attributes
+        return "".join(f" {key}=\"{value}\"" for key, value in self.props.items())
 
     def __repr__(self):
         return f"{ tag: {self.tag}, attributes: {self.props_to_html}, children: {self.children}, value: {self.value} }"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, props=props)
 
@@ -30,17 +38,40 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self):
+        yield self.to_html()
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, children=children, props=props)
 
-    def to_html(self):
+    def validate(self):
         if self.tag is None:
             raise ValueError("Parent nodes must have a tag")
         if self.children is None:
             raise ValueError("Parent nodes must have children")
-        str = ""
-        for child in self.children:
-            str += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{str}</{self.tag}>"
+
+    def to_html(self):
+        self.validate()
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # Walk the tree with an explicit stack so chunks are not re-yielded through one generator per level
+        self.validate()
+        yield f"<{self.tag}{self.props_to_html()}>"
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield f"</{node.tag}>"
+            elif isinstance(child, ParentNode):
+                child.validate()
+                yield f"<{child.tag}{child.props_to_html()}>"
+                stack.append((child, iter(child.children)))
+            else:
+                yield from child.iter_html()
 
@@ -0,0 +1,76 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from usecases import generate_page, render_page, write_page, STREAMING_THRESHOLD
+from profiler import PageProfile
+from fastio import read_text
+from buildlog import info
+
+
+def read_source(from_path):
+    started = time.perf_counter()
+    if os.path.getsize(from_path) >= STREAMING_THRESHOLD:
+        # Too large to hold in the queue; generate_page streams it instead
+        return None, 0
+    markdown = read_text(from_path)
+    return markdown, time.perf_counter() - started
+
+
+def timed_write(dest_path, page):
+    started = time.perf_counter()
+    write_page(dest_path, page)
+    return time.perf_counter() - started
+
+
+def generate_pages_pipelined(pages, template_path, basepath, io_threads=4, queue_size=16, profiler=None):
+    # Reads are prefetched and writes drained on a thread pool while this thread parses.
+    # At most queue_size sources wait to be parsed and queue_size pages wait to be written.
+    pending_pages = iter(pages)
+    reads = deque()
+    writes = deque()
+
+    def prefetch():
+        while len(reads) < queue_size:
+            page = next(pending_pages, None)
+            if page is None:
+                return
+            reads.append((page, executor.submit(read_source, page[0])))
+
+    def drain(limit):
+        while len(writes) > limit:
+            profile, future = writes.popleft()
+            seconds = future.result()
+            if profile is not None:
+                profile.stages["write"] = seconds
+                profiler.add_page(profile)
+
+    with ThreadPoolExecutor(max_workers=io_threads) as executor:
+        try:
+            prefetch()
+            while reads:
+                (from_path, dest_path), future = reads.popleft()
+                prefetch()
+                markdown, read_seconds = future.result()
+                if markdown is None:
+                    profile = PageProfile(from_path) if profiler is not None else None
+                    generate_page(from_path, template_path, dest_path, basepath, profile=profile)
+                    if profile is not None:
+                        profiler.add_page(profile)
+                    continue
+                info(f"Generating page from {from_path} to {dest_path} using {template_path}")
+                profile = None
+                if profiler is not None:
+                    profile = PageProfile(from_path)
+                    profile.stages["read"] = read_seconds
+                    profile.bytes_read = len(markdown.encode())
+                    page = render_page(markdown, template_path, basepath, profile)
+                    profile.bytes_written = len(page.encode())
+                else:
+                    page = render_page(markdown, template_path, basepath)
+                writes.append((profile, executor.submit(timed_write, dest_path, page)))
+                drain(queue_size)
+            drain(0)
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
@@ -0,0 +1,48 @@
+from os import path
+from urllib.parse import unquote
+from depgraph import page_references
+from buildlog import warning
+
+
+def output_urls(output_path, dest_dir):
+    url = "/" + path.relpath(output_path, dest_dir).replace(path.sep, "/")
+    urls = [url]
+    if url.endswith("/index.html"):
+        directory = url[:-len("index.html")]
+        urls.append(directory)
+        if directory != "/":
+            urls.append(directory.rstrip("/"))
+    elif url.endswith(".html"):
+        urls.append(url[:-len(".html")])
+    return urls
+
+
+def build_output_index(dest_dir, output_paths):
+    index = set()
+    for output_path in output_paths:
+        index.update(output_urls(output_path, dest_dir))
+    return index
+
+
+def is_internal(url):
+    return url.startswith("/") and not url.startswith("//")
+
+
+def check_page_links(from_path, index):
+    broken = []
+    for kind, url, line_number in page_references(from_path):
+        if not is_internal(url):
+            continue
+        target = unquote(url.split("#")[0].split("?")[0]) or "/"
+        if target not in index:
+            broken.append((from_path, line_number, kind, url))
+    return broken
+
+
+def check_links(sources, index):
+    broken = []
+    for from_path in sources:
+        broken.extend(check_page_links(from_path, index))
+    for from_path, line_number, kind, url in broken:
+        warning(f"{from_path}:{line_number}: broken {kind} {url}")
+    return broken
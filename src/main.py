@@ -1,51 +1,324 @@
-from os import path, listdir, mkdir
-from shutil import copy, rmtree
-from usecases import generate_page
+from os import path, listdir, remove
+from shutil import rmtree
+from usecases import generate_page, PARSER_VERSION
+from manifest import new_manifest, load_manifest, save_manifest, hash_file, page_entry, is_page_up_to_date
+from assets import sync_files, list_files, LINK_MODES
+from output import ArchiveOutput, active_output, configure_output, archive_mode
+from fingerprint import fingerprint_assets
+from template import configure_asset_urls, asset_urls_digest
+from profiler import BuildProfiler, PageProfile
+from blockcache import configure_block_cache
+from depgraph import DependencyGraph
+from linkcheck import build_output_index, check_links
+from metrics import BuildMetrics
+from shard import parse_shard, select_shard, prepare_shard_output, write_shard_manifest, merge_shards
+from buildlog import configure_logging, progress_task, debug, info, error, flush, DEBUG, INFO, WARNING
+import argparse
+import os
 import sys
 
+MANIFEST_FILE = "manifest.json"
+BLOCK_CACHE_FILE = "blocks.sqlite3"
+DEPENDENCY_GRAPH_FILE = "dependencies.json"
+
 def copy_files_recursively(source_dir, destination_dir):
     if not path.exists(source_dir):
         raise FileNotFoundError(f"Source directory {source_dir} does not exist")
-    if not path.exists(destination_dir):
-        mkdir(destination_dir)
-    else:
-        rmtree(destination_dir)
+    output = active_output()
+    output.clear(destination_dir)
 
     def recursive_copy(source, destination):
         if path.isfile(source):
-            print(f"Copying file: {source} -> {destination}")
-            copy(source, destination)
+            info(f"Copying file: {source} -> {destination}")
+            output.copy_file(source, destination)
+            return 1
+        copied = 0
+        entries = listdir(source)
+        for entry in entries:
+            copied += recursive_copy(path.join(source, entry), path.join(destination, entry))
+        return copied
+
+    return recursive_copy(source_dir, destination_dir)
+
+
+def discover_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for entry in sorted(listdir(dir_path_content)):
+        source = path.join(dir_path_content, entry)
+        if path.isfile(source):
+            pages.append((source, path.join(dest_dir_path, entry.replace(".md", ".html"))))
         else:
-            if not path.exists(destination):
-                mkdir(destination)
-            entries = listdir(source)
-            for entry in entries:
-                recursive_copy(path.join(source, entry), path.join(destination, entry))
+            pages.extend(discover_pages(source, path.join(dest_dir_path, entry)))
+    return pages
+
+
+def generate_pages(pages, template_path, basepath, jobs=1, profiler=None, io_threads=0):
+    with progress_task("Generating pages", len(pages)):
+        generate_pages_with(pages, template_path, basepath, jobs, profiler, io_threads)
 
-    recursive_copy(source_dir, destination_dir)
 
+def generate_pages_with(pages, template_path, basepath, jobs=1, profiler=None, io_threads=0):
+    if jobs > 1 and len(pages) > 1:
+        # Loading multiprocessing costs more than a small serial build, so only pay for it when asked
+        from parallel import generate_pages_parallel
+        generate_pages_parallel(pages, template_path, basepath, jobs, profiler)
+        return
+    if io_threads > 0 and len(pages) > 1:
+        from iopipeline import generate_pages_pipelined
+        generate_pages_pipelined(pages, template_path, basepath, io_threads, profiler=profiler)
+        return
+    for from_path, dest_path in pages:
+        if profiler is None:
+            generate_page(from_path, template_path, dest_path, basepath)
+            continue
+        profile = PageProfile(from_path)
+        generate_page(from_path, template_path, dest_path, basepath, profile=profile)
+        profiler.add_page(profile)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, manifest=None, jobs=1, profiler=None, io_threads=0, shard=None):
     if not path.exists(dir_path_content):
-        print(f"Content directory {dir_path_content} does not exist")
+        error(f"Content directory {dir_path_content} does not exist")
         raise FileNotFoundError("Content directory does not exist")
-    entries = listdir(dir_path_content)
-    for entry in entries:
-        if path.isfile(path.join(dir_path_content, entry)):
-            new_name = path.join(dest_dir_path, entry.replace(".md", ".html"))
-            generate_page(path.join(dir_path_content, entry), template_path, new_name, basepath)
+    pages = discover_pages(dir_path_content, dest_dir_path)
+    if shard is not None:
+        pages = select_shard(pages, dir_path_content, *shard)
+    if manifest is None:
+        generate_pages(pages, template_path, basepath, jobs, profiler, io_threads)
+        return pages, pages
+
+    template_hash = hash_file(template_path)
+    if asset_urls_digest():
+        # Fingerprinted asset names are written into every page, so they count as part of the template
+        template_hash = f"{template_hash}+{asset_urls_digest()}"
+    previous_pages = manifest["pages"]
+    current_pages = {}
+    outdated_pages = []
+    for from_path, dest_path in pages:
+        previous = previous_pages.get(from_path)
+        entry = page_entry(from_path, template_hash, basepath, dest_path, previous)
+        current_pages[from_path] = entry
+        if not is_page_up_to_date(previous, entry):
+            outdated_pages.append((from_path, dest_path))
         else:
-            if not path.exists(path.join(dest_dir_path, entry)):
-                mkdir(path.join(dest_dir_path, entry))
-            generate_pages_recursive(path.join(dir_path_content, entry), template_path, path.join(dest_dir_path, entry), basepath)
+            debug(f"Page {from_path} is up to date")
+    generate_pages(outdated_pages, template_path, basepath, jobs, profiler, io_threads)
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    current_outputs = set(entry["dest_path"] for entry in current_pages.values())
+    for from_path, entry in previous_pages.items():
+        stale_output = entry["dest_path"]
+        if from_path not in current_pages and stale_output not in current_outputs and path.exists(stale_output):
+            info(f"Removing stale page {stale_output}")
+            remove(stale_output)
+    manifest["pages"] = current_pages
+    return pages, outdated_pages
+
+
+def shard_argument(spec):
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--incremental", action="store_true", help="only rebuild pages whose inputs changed since the last build")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes used to render pages, 0 for one per CPU")
+    parser.add_argument("--io-threads", type=int, default=0, help="threads that prefetch sources and write pages while the main process parses, 0 to disable")
+    parser.add_argument("--checksum", action="store_true", help="compare static files by content hash instead of size and mtime when syncing")
+    parser.add_argument("--link-assets", choices=LINK_MODES, default="copy", help="how incremental builds place static files in the output directory")
+    parser.add_argument("--profile", choices=("text", "json"), help="record per-stage timings and print a report at the end of the build")
+    parser.add_argument("--profile-output", help="write the profiling report to this file instead of stdout")
+    parser.add_argument("--watch", action="store_true", help="keep running and rebuild affected pages and assets when sources change")
+    parser.add_argument("--serve", action="store_true", help="serve the output directory and rebuild on changes, implies --watch")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks for changes in watch mode")
+    parser.add_argument("--compress", nargs="?", const="auto", help="write precompressed siblings of text outputs, optionally a comma separated list of formats (gzip, br)")
+    parser.add_argument("--check-links", action="store_true", help="fail the build when internal links or images point at missing outputs")
+    parser.add_argument("--block-cache", action="store_true", help="reuse rendered HTML of unchanged blocks across builds")
+    parser.add_argument("--block-cache-size", type=int, default=256, help="maximum size of the block cache in MB")
+    parser.add_argument("--metrics-file", help="write build metrics to this file, as JSON for .json paths and Prometheus text otherwise")
+    parser.add_argument("--metrics-format", choices=("json", "prometheus"), help="override the metrics format implied by the file name")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--quiet", "-q", action="store_true", help="only report warnings and errors")
+    verbosity.add_argument("--verbose", "-v", action="store_true", help="also report skipped pages and other details")
+    parser.add_argument("--progress", action="store_true", help="show a progress bar on terminals, and only a summary per step otherwise, instead of a line per file")
+    parser.add_argument("--shard", type=shard_argument, metavar="INDEX/COUNT", help="build only the pages of shard INDEX of COUNT, such as 2/4, into --shard-dir")
+    parser.add_argument("--merge-shards", type=int, metavar="COUNT", help="combine the outputs of all COUNT shards in --shard-dir into the output directory")
+    parser.add_argument("--shard-dir", default="shards", help="where shard outputs and their manifests are kept")
+    parser.add_argument("--fingerprint-assets", action="store_true", help="copy static files as name.<hash>.ext for immutable caching and point pages and stylesheets at those names")
+    parser.add_argument("--output-archive", metavar="PATH", help="write the site into a .tar, .tar.gz, .tar.xz or .zip archive instead of the output directory")
+    parser.add_argument("--cache-dir", default=".ssg-cache", help="where build state such as the manifest is kept")
+    args = parser.parse_args(argv)
+    if args.output_archive is not None:
+        try:
+            archive_mode(args.output_archive)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.incremental or args.watch or args.serve or args.shard is not None or args.merge_shards is not None or args.compress:
+            parser.error("--output-archive writes a full build and cannot be combined with --incremental, --watch, --serve, --shard, --merge-shards or --compress")
+    if args.compress is not None:
+        from compress import available_formats, validate_formats
+        try:
+            args.compress_formats = available_formats() if args.compress == "auto" else validate_formats(args.compress.split(","))
+        except ValueError as e:
+            parser.error(str(e))
+    if args.io_threads > 0 and args.jobs != 1:
+        parser.error("--io-threads pipelines a single process and cannot be combined with --jobs other than 1")
+    if args.fingerprint_assets and (args.watch or args.serve or args.shard is not None or args.merge_shards is not None):
+        parser.error("--fingerprint-assets cannot be combined with --watch, --serve, --shard or --merge-shards")
+    if args.shard is not None and (args.incremental or args.watch or args.serve or args.check_links or args.merge_shards):
+        parser.error("--shard builds part of the site and cannot be combined with --incremental, --watch, --serve, --check-links or --merge-shards")
+    if args.merge_shards is not None and (args.merge_shards < 1 or args.incremental or args.watch or args.serve):
+        parser.error("--merge-shards needs a positive shard count and cannot be combined with --incremental, --watch or --serve")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(WARNING if args.quiet else DEBUG if args.verbose else INFO, args.progress)
+    args.watch = args.watch or args.serve
+    # Watch mode keeps its state in the manifest, so it always builds incrementally
+    args.incremental = args.incremental or args.watch
+    basepath = args.basepath
     source_dir = "static"
     destination_dir = "docs"
-    copy_files_recursively(source_dir, destination_dir)
-    generate_pages_recursive("content", "template.html", destination_dir, basepath)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    metrics = BuildMetrics()
+    phase = metrics.phase
+    profiler = None
+    if args.profile:
+        profiler = BuildProfiler()
+        profiler.phases = metrics.phases
+    # Always configured, so a previous in-process build's cache never leaks into this one
+    block_cache = configure_block_cache(path.join(args.cache_dir, BLOCK_CACHE_FILE) if args.block_cache else None, args.block_cache_size * 1024 * 1024, PARSER_VERSION)
+    if block_cache is not None:
+        metrics.block_cache = block_cache
+    graph_path = path.join(args.cache_dir, DEPENDENCY_GRAPH_FILE)
+    output_dir = destination_dir
+    previous_output = output = active_output()
+    if args.output_archive is not None:
+        output = configure_output(ArchiveOutput(args.output_archive, destination_dir))
+    if args.shard is not None:
+        # A shard only renders its pages; static files, dependencies and links are handled by the merge
+        index, count = args.shard
+        graph = None
+        output_dir = prepare_shard_output(args.shard_dir, index, count)
+        with phase("pages"):
+            pages, built_pages = generate_pages_recursive("content", "template.html", output_dir, basepath, jobs=jobs, profiler=profiler, io_threads=args.io_threads, shard=args.shard)
+        write_shard_manifest(args.shard_dir, index, count, pages, "template.html", basepath, destination_dir)
+        info(f"Built shard {index}/{count} with {len(pages)} pages into {output_dir}")
+    elif args.merge_shards is not None:
+        graph = DependencyGraph()
+        manifest = new_manifest()
+        with phase("static"), progress_task("Copying files", None):
+            if path.exists(destination_dir):
+                rmtree(destination_dir)
+            manifest["assets"] = sync_files(source_dir, destination_dir, link=args.link_assets, on_copy=lambda destination: metrics.count("files_copied"))
+        with phase("merge"), progress_task("Merging shards", None):
+            pages = discover_pages("content", destination_dir)
+            manifest["pages"] = merge_shards(args.shard_dir, args.merge_shards, pages, destination_dir, "template.html", basepath, args.link_assets)
+        save_manifest(path.join(args.cache_dir, MANIFEST_FILE), manifest)
+        # Every page is new to this output tree, so the dependency graph covers all of them
+        built_pages = pages
+    elif not args.incremental:
+        # Only incremental and watch builds read the dependency graph, so a full build skips scanning for it
+        graph = None
+        with phase("static"), progress_task("Copying files", None):
+            if args.fingerprint_assets:
+                output.clear(destination_dir)
+                asset_urls, _ = fingerprint_assets(source_dir, destination_dir, on_copy=lambda destination: metrics.count("files_copied"))
+                configure_asset_urls(asset_urls)
+            else:
+                metrics.count("files_copied", copy_files_recursively(source_dir, destination_dir))
+        with phase("pages"):
+            pages, built_pages = generate_pages_recursive("content", "template.html", destination_dir, basepath, jobs=jobs, profiler=profiler, io_threads=args.io_threads)
+    else:
+        graph = DependencyGraph.load(graph_path)
+        manifest_path = path.join(args.cache_dir, MANIFEST_FILE)
+        manifest = load_manifest(manifest_path)
+        with phase("static"), progress_task("Copying files", None):
+            if args.fingerprint_assets:
+                asset_urls, manifest["assets"] = fingerprint_assets(source_dir, destination_dir, manifest["assets"], incremental=True, on_copy=lambda destination: metrics.count("files_copied"))
+                configure_asset_urls(asset_urls)
+            else:
+                manifest["assets"] = sync_files(source_dir, destination_dir, manifest["assets"], args.checksum, args.link_assets, on_copy=lambda destination: metrics.count("files_copied"))
+        with phase("pages"):
+            pages, built_pages = generate_pages_recursive("content", "template.html", destination_dir, basepath, manifest, jobs, profiler, args.io_threads)
+        save_manifest(manifest_path, manifest)
+    output.close()
+    configure_output(previous_output)
+    configure_asset_urls(None)
+    metrics.record_pages(pages, built_pages, output.size)
+    if graph is not None:
+        with phase("dependencies"):
+            graph.update_pages(built_pages, "template.html", "content", source_dir)
+            graph.retain_outputs(set(dest_path for _, dest_path in pages))
+            graph.save(graph_path)
+    broken_links = []
+    if args.check_links:
+        with phase("links"):
+            outputs = [dest_path for _, dest_path in pages] + [path.join(destination_dir, relative) for relative in list_files(source_dir)]
+            broken_links = check_links([from_path for from_path, _ in pages], build_output_index(destination_dir, outputs))
+        info(f"Checked links in {len(pages)} pages, {len(broken_links)} broken")
+        metrics.count("broken_links", len(broken_links))
+    if args.compress:
+        from compress import compress_tree
+        with phase("compress"):
+            compress_tree(output_dir, args.compress_formats, jobs)
+    if block_cache is not None:
+        block_cache.close()
+        info(f"Block cache: {block_cache.hits} hits, {block_cache.misses} misses")
+    if profiler is not None:
+        write_report(profiler.report(args.profile), args.profile_output)
+    if args.metrics_file:
+        metrics.write(args.metrics_file, args.metrics_format)
+    if not args.watch:
+        if broken_links:
+            sys.exit(1)
+        return
+
+    def after_rebuild():
+        save_manifest(manifest_path, manifest)
+        graph.save(graph_path)
+        if args.compress:
+            # Unchanged outputs keep their siblings' mtimes and are skipped, so only rebuilt files are recompressed
+            from compress import compress_tree
+            compress_tree(output_dir, args.compress_formats, jobs)
+        if block_cache is not None:
+            # Flushes and evicts, so a long session stays within --block-cache-size
+            block_cache.close()
+
+    from devserver import SiteWatcher, serve
+    watcher = SiteWatcher(
+        "content", source_dir, "template.html", destination_dir, basepath, manifest,
+        rebuild_all=lambda: generate_pages_recursive("content", "template.html", destination_dir, basepath, manifest, jobs),
+        on_rebuild=after_rebuild,
+        graph=graph,
+        check_links=args.check_links,
+    )
+    server = serve(destination_dir, args.port) if args.serve else None
+    try:
+        watcher.watch(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if block_cache is not None:
+            block_cache.close()
+        if server is not None:
+            server.shutdown()
+
 
+def write_report(report, output_path=None):
+    if output_path is None:
+        flush()
+        print(report)
+        return
+    with open(output_path, 'w') as report_file:
+        report_file.write(report + "\n")
 
-main()
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+from os import path
+from buildlog import warning
+from fastio import write_atomic
+
+MANIFEST_VERSION = 1
+
+
+def new_manifest():
+    return {"version": MANIFEST_VERSION, "pages": {}, "assets": {}}
+
+
+def load_manifest(manifest_path):
+    if not path.exists(manifest_path):
+        return new_manifest()
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        warning(f"Ignoring unreadable manifest {manifest_path}")
+        return new_manifest()
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return new_manifest()
+    manifest.setdefault("pages", {})
+    manifest.setdefault("assets", {})
+    return manifest
+
+
+def save_manifest(manifest_path, manifest):
+    write_atomic(manifest_path, json.dumps(manifest, indent=1, sort_keys=True))
+
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def page_entry(from_path, template_hash, basepath, dest_path, previous=None):
+    stat = os.stat(from_path)
+    # Reuse the stored hash when size and mtime are untouched, so unchanged pages are never re-read
+    if previous is not None and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        source_hash = previous["source_hash"]
+    else:
+        source_hash = hash_file(from_path)
+    return {
+        "source_hash": source_hash,
+        "template_hash": template_hash,
+        "basepath": basepath,
+        "dest_path": dest_path,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def is_page_up_to_date(previous, entry):
+    if previous is None:
+        return False
+    for key in ("source_hash", "template_hash", "basepath", "dest_path"):
+        if previous.get(key) != entry[key]:
+            return False
+    return path.exists(entry["dest_path"])
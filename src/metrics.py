@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+import time
+from profiler import timed
+from fastio import write_atomic
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+METRIC_HELP = {
+    "pages_total": "Pages discovered under the content directory",
+    "pages_rendered": "Pages rendered by this build",
+    "pages_skipped": "Pages skipped because their inputs were unchanged",
+    "bytes_read": "Bytes of markdown read for rendered pages",
+    "bytes_written": "Bytes of HTML written for rendered pages",
+    "files_copied": "Static files copied into the output directory",
+    "broken_links": "Broken internal links and images",
+    "block_cache_hits": "Block cache hits",
+    "block_cache_misses": "Block cache misses",
+    "block_cache_hit_ratio": "Share of block cache lookups that hit",
+    "duration_seconds": "Wall time of the whole build",
+    "peak_rss_bytes": "Peak resident set size of the build and its worker processes",
+}
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1 if sys.platform == "darwin" else 1024
+    return max(own, children) * scale
+
+
+def file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+class BuildMetrics():
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counters = {
+            "pages_total": 0,
+            "pages_rendered": 0,
+            "pages_skipped": 0,
+            "bytes_read": 0,
+            "bytes_written": 0,
+            "files_copied": 0,
+            "broken_links": 0,
+        }
+        self.phases = {}
+        self.block_cache = None
+
+    def phase(self, name):
+        return timed(self.phases, name)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_pages(self, pages, built_pages, output_size=file_size):
+        self.count("pages_total", len(pages))
+        self.count("pages_rendered", len(built_pages))
+        self.count("pages_skipped", len(pages) - len(built_pages))
+        for from_path, dest_path in built_pages:
+            self.count("bytes_read", file_size(from_path))
+            self.count("bytes_written", output_size(dest_path))
+
+    def snapshot(self):
+        values = dict(self.counters)
+        if self.block_cache is not None:
+            values["block_cache_hits"] = self.block_cache.hits
+            values["block_cache_misses"] = self.block_cache.misses
+            values["block_cache_hit_ratio"] = self.block_cache.hit_rate
+        values["duration_seconds"] = round(time.perf_counter() - self.started, 6)
+        values["peak_rss_bytes"] = peak_rss_bytes()
+        values["phase_seconds"] = {name: round(seconds, 6) for name, seconds in self.phases.items()}
+        return values
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=1, sort_keys=True)
+
+    def to_prometheus(self, prefix="ssg_build"):
+        values = self.snapshot()
+        lines = []
+        for name, help_text in METRIC_HELP.items():
+            value = values.get(name)
+            if value is None:
+                continue
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        lines.append(f"# HELP {prefix}_phase_seconds Wall time spent in each build phase")
+        lines.append(f"# TYPE {prefix}_phase_seconds gauge")
+        for name, seconds in values["phase_seconds"].items():
+            lines.append(f"{prefix}_phase_seconds{{phase=\"{name}\"}} {seconds}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, metrics_path, format=None):
+        if format is None:
+            format = "json" if metrics_path.endswith(".json") else "prometheus"
+        # A node exporter scraping the file never sees half of it
+        write_atomic(metrics_path, self.to_json() + "\n" if format == "json" else self.to_prometheus())
@@ -0,0 +1,179 @@
+import io
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from os import path
+from fastio import copy_file, SOURCE_ENCODING
+# Pages up to this size stay in memory before an archive entry spills them to disk
+SPOOL_SIZE = 8 * 1024 * 1024
+ARCHIVE_MODES = {".tar": "w", ".tar.gz": "w:gz", ".tgz": "w:gz", ".tar.xz": "w:xz", ".zip": "zip"}
+
+
+class FileSystemOutput():
+    def clear(self, root):
+        if path.exists(root):
+            shutil.rmtree(root)
+        os.makedirs(root)
+
+    @contextmanager
+    def open_text(self, dest_path):
+        os.makedirs(path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'w') as dest_file:
+            yield dest_file
+
+    def write_bytes(self, dest_path, data):
+        os.makedirs(path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'wb') as dest_file:
+            dest_file.write(data)
+
+    def copy_file(self, source, dest_path):
+        os.makedirs(path.dirname(dest_path), exist_ok=True)
+        copy_file(source, dest_path)
+
+    def size(self, dest_path):
+        try:
+            return path.getsize(dest_path)
+        except OSError:
+            return 0
+
+    def close(self):
+        pass
+
+
+class MemoryOutput():
+    def __init__(self):
+        self.files = {}
+
+    def clear(self, root):
+        prefix = path.join(root, "")
+        for dest_path in [dest_path for dest_path in self.files if dest_path.startswith(prefix)]:
+            del self.files[dest_path]
+
+    @contextmanager
+    def open_text(self, dest_path):
+        buffer = io.StringIO()
+        yield buffer
+        self.files[dest_path] = buffer.getvalue().encode(SOURCE_ENCODING)
+
+    def write_bytes(self, dest_path, data):
+        self.files[dest_path] = bytes(data)
+
+    def copy_file(self, source, dest_path):
+        with open(source, 'rb') as source_file:
+            self.files[dest_path] = source_file.read()
+
+    def size(self, dest_path):
+        return len(self.files.get(dest_path, b""))
+
+    def read_text(self, dest_path):
+        return self.files[dest_path].decode(SOURCE_ENCODING)
+
+    def drain(self):
+        files = list(self.files.items())
+        self.files = {}
+        return files
+
+    def close(self):
+        pass
+
+
+def archive_mode(archive_path):
+    for suffix, mode in ARCHIVE_MODES.items():
+        if archive_path.endswith(suffix):
+            return mode
+    raise ValueError(f"Unsupported archive {archive_path}, expected one of {', '.join(ARCHIVE_MODES)}")
+
+
+class ArchiveOutput():
+    def __init__(self, archive_path, root):
+        self.archive_path = archive_path
+        self.root = root
+        self.mode = archive_mode(archive_path)
+        self.sizes = {}
+        # Entries are added from the I/O threads too, and archives take one entry at a time
+        self.lock = threading.Lock()
+        # Written beside the target and renamed on close, so a failed build never leaves a truncated archive
+        self.tmp_path = f"{archive_path}.tmp"
+        directory = path.dirname(archive_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Archive modules are only loaded by builds that write one, keeping them out of startup
+        import tarfile
+        import zipfile
+        if self.mode == "zip":
+            self.archive = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = tarfile.open(self.tmp_path, self.mode)
+
+    def entry_name(self, dest_path):
+        name = path.relpath(dest_path, self.root)
+        if name.startswith(os.pardir):
+            raise ValueError(f"{dest_path} is outside the archived directory {self.root}")
+        return name.replace(path.sep, "/")
+
+    def clear(self, root):
+        pass
+
+    def add_entry(self, dest_path, fileobj, size, mtime=None):
+        name = self.entry_name(dest_path)
+        mtime = time.time() if mtime is None else mtime
+        import tarfile
+        import zipfile
+        with self.lock:
+            if self.mode == "zip":
+                info = zipfile.ZipInfo(name, time.localtime(mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with self.archive.open(info, "w") as entry:
+                    shutil.copyfileobj(fileobj, entry, 1 << 20)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = size
+                info.mtime = mtime
+                info.mode = 0o644
+                self.archive.addfile(info, fileobj)
+            self.sizes[dest_path] = size
+
+    @contextmanager
+    def open_text(self, dest_path):
+        import tempfile
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            text_file = io.TextIOWrapper(spool, encoding=SOURCE_ENCODING)
+            yield text_file
+            text_file.flush()
+            size = spool.tell()
+            spool.seek(0)
+            self.add_entry(dest_path, spool, size)
+            text_file.detach()
+
+    def write_bytes(self, dest_path, data):
+        self.add_entry(dest_path, io.BytesIO(data), len(data))
+
+    def copy_file(self, source, dest_path):
+        stat = os.stat(source)
+        with open(source, 'rb') as source_file:
+            self.add_entry(dest_path, source_file, stat.st_size, stat.st_mtime)
+
+    def size(self, dest_path):
+        return self.sizes.get(dest_path, 0)
+
+    def close(self):
+        if self.archive is None:
+            return
+        self.archive.close()
+        self.archive = None
+        os.replace(self.tmp_path, self.archive_path)
+
+
+_active_output = FileSystemOutput()
+
+
+def configure_output(output):
+    global _active_output
+    _active_output = output
+    return output
+
+
+def active_output():
+    return _active_output
@@ -0,0 +1,64 @@
+from concurrent.futures import ProcessPoolExecutor
+from usecases import generate_page
+from profiler import PageProfile
+from blockcache import active_block_cache, configure_block_cache
+from buildlog import info
+from output import FileSystemOutput, MemoryOutput, active_output, configure_output
+from template import active_asset_urls, configure_asset_urls
+
+
+def generate_page_job(job):
+    from_path, template_path, dest_path, basepath, profiled = job
+    messages = []
+    profile = PageProfile(from_path) if profiled else None
+    cache = active_block_cache()
+    lookups = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    try:
+        generate_page(from_path, template_path, dest_path, basepath, log=messages.append, profile=profile)
+    except Exception as e:
+        raise RuntimeError(f"Failed to generate page {from_path}") from e
+    # Workers only write to disk themselves; other outputs receive the pages from the parent
+    output = active_output()
+    outputs = output.drain() if isinstance(output, MemoryOutput) else []
+    # Report this page's cache lookups so the parent can keep build-wide hit rates
+    if cache is not None:
+        lookups = (cache.hits - lookups[0], cache.misses - lookups[1])
+    return messages, profile, lookups, outputs
+
+
+def init_worker(cache_config, collect_outputs, asset_urls):
+    if asset_urls:
+        configure_asset_urls(asset_urls)
+    if cache_config is not None:
+        configure_block_cache(*cache_config)
+    if collect_outputs:
+        configure_output(MemoryOutput())
+
+
+def generate_pages_parallel(pages, template_path, basepath, jobs, profiler=None):
+    work = [(from_path, template_path, dest_path, basepath, profiler is not None) for from_path, dest_path in pages]
+    if not work:
+        return
+    # A few chunks per worker keeps IPC overhead low while still balancing uneven page sizes
+    chunksize = max(1, len(work) // (jobs * 4))
+    cache = active_block_cache()
+    cache_config = (cache.db_path, cache.max_bytes, cache.version) if cache is not None else None
+    output = active_output()
+    collect_outputs = not isinstance(output, FileSystemOutput)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache_config, collect_outputs, active_asset_urls())) as executor:
+        # map yields results in submission order, so logs come out in the same order as a serial build
+        # and the first failing page is the one that is raised
+        try:
+            for messages, profile, lookups, outputs in executor.map(generate_page_job, work, chunksize=chunksize):
+                for message in messages:
+                    info(message)
+                for dest_path, data in outputs:
+                    output.write_bytes(dest_path, data)
+                if profiler is not None:
+                    profiler.add_page(profile)
+                if cache is not None:
+                    cache.hits += lookups[0]
+                    cache.misses += lookups[1]
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
@@ -0,0 +1,92 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+PAGE_STAGES = ("read", "split", "classify", "inline", "serialize", "template", "write")
+
+
+@contextmanager
+def timed(totals, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        totals[name] = totals.get(name, 0) + time.perf_counter() - start
+
+
+class PageProfile():
+    def __init__(self, source):
+        self.source = source
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.stages = {}
+
+    def stage(self, name):
+        return timed(self.stages, name)
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+
+class NullProfile():
+    def stage(self, name):
+        return nullcontext()
+
+
+NULL_PROFILE = NullProfile()
+
+
+class BuildProfiler():
+    def __init__(self):
+        self.pages = []
+        self.phases = {}
+        self.started = time.perf_counter()
+
+    def phase(self, name):
+        return timed(self.phases, name)
+
+    def add_page(self, profile):
+        self.pages.append(profile)
+
+    def summary(self, slowest=10):
+        elapsed = time.perf_counter() - self.started
+        stage_totals = {stage: 0 for stage in PAGE_STAGES}
+        for page in self.pages:
+            for stage, seconds in page.stages.items():
+                stage_totals[stage] = stage_totals.get(stage, 0) + seconds
+        bytes_read = sum(page.bytes_read for page in self.pages)
+        bytes_written = sum(page.bytes_written for page in self.pages)
+        page_time = sum(stage_totals.values())
+        slowest_pages = sorted(self.pages, key=lambda page: page.total, reverse=True)[:slowest]
+        return {
+            "elapsed_s": round(elapsed, 6),
+            "pages": len(self.pages),
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written,
+            "pages_per_s": round(len(self.pages) / elapsed, 3) if elapsed > 0 else None,
+            "mb_per_s": round(bytes_read / page_time / 1e6, 3) if page_time > 0 else None,
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "stages": {name: round(seconds, 6) for name, seconds in stage_totals.items()},
+            "slowest_pages": [
+                {"source": page.source, "total_s": round(page.total, 6), "bytes": page.bytes_read} for page in slowest_pages
+            ],
+        }
+
+    def report(self, format="text", slowest=10):
+        summary = self.summary(slowest)
+        if format == "json":
+            return json.dumps(summary, indent=1)
+        lines = [
+            f"Built {summary['pages']} pages in {summary['elapsed_s']:.3f}s "
+            f"({summary['pages_per_s']} pages/s, {summary['mb_per_s']} MB/s of markdown)",
+        ]
+        for name, seconds in summary["phases"].items():
+            lines.append(f"  phase {name:<10} {seconds:10.4f}s")
+        total = sum(summary["stages"].values()) or 1
+        for name, seconds in summary["stages"].items():
+            lines.append(f"  stage {name:<10} {seconds:10.4f}s {100 * seconds / total:5.1f}%")
+        lines.append("Slowest pages:")
+        for page in summary["slowest_pages"]:
+            lines.append(f"  {page['total_s']:10.4f}s {page['bytes']:>10} B  {page['source']}")
+        return "\n".join(lines)
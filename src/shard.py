@@ -0,0 +1,92 @@
+import hashlib
+import os
+import shutil
+from os import path
+from manifest import new_manifest, load_manifest, save_manifest, hash_file, page_entry
+from assets import list_files, place_file
+from buildlog import info
+
+
+def parse_shard(spec):
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec}, expected INDEX/COUNT such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {spec}, INDEX must be between 1 and COUNT")
+    return index, count
+
+
+def shard_of(from_path, content_dir, count):
+    # Hash the path relative to the content directory so every machine agrees regardless of checkout location
+    relative = path.relpath(from_path, content_dir).replace(path.sep, "/")
+    digest = hashlib.sha256(relative.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(pages, content_dir, index, count):
+    return [(from_path, dest_path) for from_path, dest_path in pages if shard_of(from_path, content_dir, count) == index]
+
+
+def shard_output_dir(shard_dir, index, count):
+    return path.join(shard_dir, f"{index}-of-{count}")
+
+
+def shard_manifest_path(shard_dir, index, count):
+    return shard_output_dir(shard_dir, index, count) + ".json"
+
+
+def prepare_shard_output(shard_dir, index, count):
+    output_dir = shard_output_dir(shard_dir, index, count)
+    if path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    return output_dir
+
+
+def write_shard_manifest(shard_dir, index, count, pages, template_path, basepath, dest_dir):
+    output_dir = shard_output_dir(shard_dir, index, count)
+    template_hash = hash_file(template_path)
+    manifest = new_manifest()
+    manifest["shard"] = {"index": index, "count": count}
+    # Entries name the final destination so the merged manifest can drive later incremental builds
+    for from_path, dest_path in pages:
+        final_path = path.join(dest_dir, path.relpath(dest_path, output_dir))
+        manifest["pages"][from_path] = page_entry(from_path, template_hash, basepath, final_path)
+    save_manifest(shard_manifest_path(shard_dir, index, count), manifest)
+    return manifest
+
+
+def load_shard_manifest(shard_dir, index, count):
+    manifest_path = shard_manifest_path(shard_dir, index, count)
+    manifest = load_manifest(manifest_path)
+    if manifest.get("shard") != {"index": index, "count": count}:
+        raise FileNotFoundError(f"Shard {index}/{count} has no manifest at {manifest_path}")
+    return manifest
+
+
+def merge_shards(shard_dir, count, pages, dest_dir, template_path, basepath, link="copy"):
+    template_hash = hash_file(template_path)
+    expected = dict(pages)
+    merged = {}
+    for index in range(1, count + 1):
+        manifest = load_shard_manifest(shard_dir, index, count)
+        for from_path, entry in manifest["pages"].items():
+            if expected.get(from_path) != entry["dest_path"]:
+                raise ValueError(f"Shard {index}/{count} contains {from_path}, which is not a page of this site")
+            if from_path in merged:
+                raise ValueError(f"Page {from_path} was built by more than one shard")
+            if entry["template_hash"] != template_hash or entry["basepath"] != basepath:
+                raise ValueError(f"Shard {index}/{count} was built with a different template or basepath")
+            merged[from_path] = entry
+        output_dir = shard_output_dir(shard_dir, index, count)
+        for relative in list_files(output_dir):
+            source = path.join(output_dir, relative)
+            destination = path.join(dest_dir, relative)
+            info(f"Copying file: {source} -> {destination}")
+            os.makedirs(path.dirname(destination), exist_ok=True)
+            place_file(source, destination, link)
+    missing = [from_path for from_path in expected if from_path not in merged]
+    if missing:
+        raise ValueError(f"No shard built {len(missing)} pages, including {missing[0]}")
+    return merged
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import re
+
+SLOT_PATTERN = re.compile(r"\{\{ *(\w+) *\}\}")
+# The path part of a site-absolute href or src, without any query or fragment
+ASSET_URL_PATTERN = re.compile(r'((?:href|src)=")(/[^"#?]*)')
+
+_asset_urls = {}
+_asset_urls_digest = ""
+
+
+def rewrite_basepath(html, basepath):
+    if basepath == "/":
+        return html
+    html = html.replace("href=\"/", f"href=\"{basepath}")
+    return html.replace("src=\"/", f"src=\"{basepath}")
+
+
+def configure_asset_urls(asset_urls):
+    global _asset_urls, _asset_urls_digest
+    asset_urls = dict(asset_urls or {})
+    if asset_urls == _asset_urls:
+        return
+    _asset_urls = asset_urls
+    digest = hashlib.sha256(repr(sorted(_asset_urls.items())).encode()).hexdigest()
+    _asset_urls_digest = digest if _asset_urls else ""
+    # Cached templates have the previous table baked into their literal segments
+    _compiled_templates.clear()
+
+
+def active_asset_urls():
+    return _asset_urls
+
+
+def asset_urls_digest():
+    return _asset_urls_digest
+
+
+def rewrite_asset_urls(html):
+    if not _asset_urls or '="/' not in html:
+        return html
+    return ASSET_URL_PATTERN.sub(lambda match: match.group(1) + _asset_urls.get(match.group(2), match.group(2)), html)
+
+
+def rewrite_urls(html, basepath):
+    # Asset names are swapped first, since the table holds URLs without the basepath
+    return rewrite_basepath(rewrite_asset_urls(html), basepath)
+
+
+class Template():
+    def __init__(self, source):
+        self.source = source
+        # Even indexes hold literal text, odd indexes hold slot names
+        self.segments = SLOT_PATTERN.split(source)
+        self.raw_slots = [match.group(0) for match in SLOT_PATTERN.finditer(source)]
+        self.repeated_slots = set(slot for slot in self.slots if self.slots.count(slot) > 1)
+
+    @property
+    def slots(self):
+        return self.segments[1::2]
+
+    def with_basepath(self, basepath):
+        template = Template.__new__(Template)
+        template.source = self.source
+        template.raw_slots = self.raw_slots
+        template.repeated_slots = self.repeated_slots
+        template.segments = [segment if i % 2 else rewrite_urls(segment, basepath) for i, segment in enumerate(self.segments)]
+        return template
+
+    def materialize(self, values):
+        # A generator can only be consumed once, so a slot used several times needs its chunks kept
+        repeated = [slot for slot in self.repeated_slots if slot in values and not isinstance(values[slot], str)]
+        if not repeated:
+            return values
+        values = dict(values)
+        for slot in repeated:
+            values[slot] = list(values[slot])
+        return values
+
+    def render(self, values):
+        values = self.materialize(values)
+        parts = []
+        for i, segment in enumerate(self.segments):
+            if i % 2 == 0:
+                parts.append(segment)
+            elif segment not in values:
+                # Unknown slots are left untouched, as plain str.replace would
+                parts.append(self.raw_slots[i // 2])
+            elif isinstance(values[segment], str):
+                parts.append(values[segment])
+            else:
+                parts.extend(values[segment])
+        return "".join(parts)
+
+    def write(self, fp, values):
+        # Slot values may be strings or iterables of chunks, which are streamed without being joined
+        values = self.materialize(values)
+        for i, segment in enumerate(self.segments):
+            if i % 2 == 0:
+                fp.write(segment)
+            elif segment not in values:
+                fp.write(self.raw_slots[i // 2])
+            elif isinstance(values[segment], str):
+                fp.write(values[segment])
+            else:
+                for chunk in values[segment]:
+                    fp.write(chunk)
+
+    def __repr__(self):
+        return f"Template({self.slots})"
+
+
+_compiled_templates = {}
+
+def load_template(template_path, basepath="/"):
+    stat = os.stat(template_path)
+    key = (template_path, basepath)
+    cached = _compiled_templates.get(key)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    with open(template_path, 'r') as template_file:
+        template = Template(template_file.read()).with_basepath(basepath)
+    _compiled_templates[key] = ((stat.st_mtime_ns, stat.st_size), template)
+    return template
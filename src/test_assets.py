@@ -0,0 +1,53 @@
+import unittest
+import os
+from os import path
+
+from test_main import BuildTestCase
+from assets import sync_files
+
+
+class TestSyncFiles(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = path.join(self.root, "static")
+        os.makedirs(path.join(self.source, "images"))
+        self.write(path.join(self.source, "index.css"), "body {}")
+        self.write(path.join(self.source, "images", "logo.png"), "png")
+
+    def test_copies_new_files(self):
+        assets = sync_files(self.source, self.dest)
+        self.assertEqual(self.read(path.join(self.dest, "images", "logo.png")), "png")
+        self.assertEqual(len(assets), 2)
+
+    def test_skips_unchanged_files(self):
+        assets = sync_files(self.source, self.dest)
+        copied = path.join(self.dest, "index.css")
+        inode = os.stat(copied).st_ino
+        sync_files(self.source, self.dest, assets)
+        self.assertEqual(os.stat(copied).st_ino, inode)
+
+    def test_copies_changed_files(self):
+        assets = sync_files(self.source, self.dest)
+        self.write(path.join(self.source, "index.css"), "body { margin: 0 }")
+        sync_files(self.source, self.dest, assets)
+        self.assertEqual(self.read(path.join(self.dest, "index.css")), "body { margin: 0 }")
+
+    def test_removes_stale_files_only(self):
+        assets = sync_files(self.source, self.dest)
+        page = path.join(self.dest, "index.html")
+        self.write(page, "<p>generated</p>")
+        os.remove(path.join(self.source, "images", "logo.png"))
+        sync_files(self.source, self.dest, assets)
+        self.assertFalse(path.exists(path.join(self.dest, "images", "logo.png")))
+        self.assertTrue(path.exists(page))
+
+    def test_hardlink(self):
+        sync_files(self.source, self.dest, link="hardlink")
+        self.assertTrue(path.samefile(path.join(self.source, "index.css"), path.join(self.dest, "index.css")))
+
+    def test_reflink_falls_back_to_copy(self):
+        sync_files(self.source, self.dest, link="reflink")
+        self.assertEqual(self.read(path.join(self.dest, "index.css")), "body {}")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import tempfile
+from os import path
+
+from blockcache import BlockCache
+from blocknode import BlockType
+from usecases import markdown_to_html_node
+
+LONG_PARAGRAPH = "This is a **long** paragraph with a [link](/blog) " * 10
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = path.join(self.tmp.name, "blocks.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_across_instances(self):
+        cache = BlockCache(self.db_path)
+        cache.put(BlockType.PARAGRAPH, "text", "<p>text</p>")
+        cache.close()
+        reopened = BlockCache(self.db_path)
+        self.assertEqual(reopened.get(BlockType.PARAGRAPH, "text"), "<p>text</p>")
+        self.assertIsNone(reopened.get(BlockType.HEADING, "text"))
+        self.assertEqual((reopened.hits, reopened.misses), (1, 1))
+        reopened.close()
+
+    def test_version_is_part_of_key(self):
+        cache = BlockCache(self.db_path, version=1)
+        cache.put(BlockType.PARAGRAPH, "text", "<p>text</p>")
+        cache.close()
+        newer = BlockCache(self.db_path, version=2)
+        self.assertIsNone(newer.get(BlockType.PARAGRAPH, "text"))
+        newer.close()
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(self.db_path, max_bytes=150)
+        cache.put(BlockType.PARAGRAPH, "old", "x" * 50)
+        cache.flush()
+        cache.put(BlockType.PARAGRAPH, "new", "y" * 50)
+        cache.flush()
+        cache.put(BlockType.PARAGRAPH, "newest", "z" * 50)
+        cache.close()
+        cache = BlockCache(self.db_path, max_bytes=150)
+        self.assertIsNone(cache.get(BlockType.PARAGRAPH, "old"))
+        self.assertEqual(cache.get(BlockType.PARAGRAPH, "newest"), "z" * 50)
+        cache.close()
+
+    def test_markdown_to_html_node_with_cache(self):
+        markdown = f"# Title\n\n{LONG_PARAGRAPH}\n\n- short list"
+        expected = markdown_to_html_node(markdown).to_html()
+        cache = BlockCache(self.db_path)
+        self.assertEqual(markdown_to_html_node(markdown, cache=cache).to_html(), expected)
+        cache.flush()
+        self.assertEqual(markdown_to_html_node(markdown, cache=cache).to_html(), expected)
+        self.assertEqual(cache.hits, 1)
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
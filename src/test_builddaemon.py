@@ -0,0 +1,69 @@
+import unittest
+import os
+import threading
+from os import path
+
+from test_main import BuildTestCase
+from builddaemon import BuildDaemon, create_server
+from buildclient import send_request
+from blockcache import active_block_cache
+
+
+class TestBuildDaemon(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(path.join(self.root, "static"))
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+        self.socket_path = path.join(self.root, ".ssg-cache", "daemon.sock")
+        self.daemon = BuildDaemon(self.root, self.socket_path)
+        self.server = create_server(self.daemon)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        os.chdir(self.cwd)
+        super().tearDown()
+
+    def request(self, command, args=(), cwd=None):
+        return send_request(self.socket_path, {"command": command, "args": list(args), "cwd": cwd or self.root}, timeout=10)
+
+    def test_builds_and_captures_output(self):
+        response = self.request("build", ["--incremental"])
+        self.assertEqual(response["exit_code"], 0)
+        self.assertIn("Generating page from content/index.md", response["output"])
+        self.assertIn("<h1>Home</h1>", self.read(path.join(self.dest, "index.html")))
+        response = self.request("build", ["--incremental"])
+        self.assertNotIn("Generating page", response["output"])
+        self.assertIn("2 builds", self.request("status")["output"])
+
+    def test_reports_failures(self):
+        self.assertEqual(self.request("build", ["--shard", "3/2"])["exit_code"], 2)
+        self.assertEqual(self.request("build", ["--watch"])["exit_code"], 2)
+        self.assertEqual(self.request("build", ["--jobs", "2", "--io-threads", "2"])["exit_code"], 2)
+        self.assertEqual(self.request("build", cwd=self.cwd)["exit_code"], 2)
+        self.assertFalse(path.exists(self.dest))
+
+    def test_block_cache_does_not_outlive_its_build(self):
+        self.assertEqual(self.request("build", ["--block-cache"])["exit_code"], 0)
+        self.assertIsNone(active_block_cache())
+        self.assertEqual(self.request("build")["exit_code"], 0)
+        self.assertIsNone(active_block_cache())
+
+    def test_only_incremental_builds_keep_a_dependency_graph(self):
+        graph_path = path.join(self.root, ".ssg-cache", "dependencies.json")
+        self.assertEqual(self.request("build")["exit_code"], 0)
+        self.assertFalse(path.exists(graph_path))
+        self.assertEqual(self.request("build", ["--incremental"])["exit_code"], 0)
+        self.assertTrue(path.exists(graph_path))
+
+    def test_refuses_second_daemon(self):
+        with self.assertRaises(RuntimeError):
+            create_server(BuildDaemon(self.root, self.socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
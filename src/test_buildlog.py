@@ -0,0 +1,47 @@
+import unittest
+import io
+
+from buildlog import BuildLog, DEBUG, INFO, WARNING
+
+
+class TestBuildLog(unittest.TestCase):
+    def test_filters_by_level(self):
+        stream = io.StringIO()
+        log = BuildLog(WARNING, stream)
+        log.info("Copying file: a -> b")
+        log.warning("content/index.md:3: broken link /missing")
+        log.flush()
+        self.assertEqual(stream.getvalue(), "content/index.md:3: broken link /missing\n")
+
+    def test_buffers_until_flush(self):
+        stream = io.StringIO()
+        log = BuildLog(DEBUG, stream)
+        log.info("Generating page a")
+        log.debug("Page b is up to date")
+        self.assertEqual(stream.getvalue(), "")
+        log.flush()
+        self.assertEqual(stream.getvalue(), "Generating page a\nPage b is up to date\n")
+
+    def test_progress_summarises_per_file_messages(self):
+        stream = io.StringIO()
+        log = BuildLog(INFO, stream, progress=True)
+        with log.progress_task("Generating pages", 3):
+            for name in ("a", "b", "c"):
+                log.info(f"Generating page {name}")
+            log.warning("Something odd")
+        log.flush()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "Something odd")
+        self.assertTrue(lines[1].startswith("Generating pages: 3 of 3 in "))
+
+    def test_quiet_progress_prints_nothing(self):
+        stream = io.StringIO()
+        log = BuildLog(WARNING, stream, progress=True)
+        with log.progress_task("Copying files", None):
+            log.info("Copying file: a -> b")
+        log.flush()
+        self.assertEqual(stream.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import gzip
+import os
+from os import path
+
+from test_main import BuildTestCase
+from compress import compress_tree, compress_file
+
+
+class TestCompress(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.dest)
+        self.page = path.join(self.dest, "index.html")
+        self.write(self.page, "<p>Tolkien</p>" * 100)
+        self.write(path.join(self.dest, "logo.png"), "not really a png" * 100)
+
+    def test_compresses_text_outputs_only(self):
+        compress_tree(self.dest, ["gzip"], threads=2)
+        with gzip.open(self.page + ".gz", 'rt') as f:
+            self.assertEqual(f.read(), "<p>Tolkien</p>" * 100)
+        self.assertFalse(path.exists(path.join(self.dest, "logo.png.gz")))
+
+    def test_skips_unchanged_files(self):
+        self.assertEqual(compress_file(self.page, ["gzip"]), 1)
+        self.assertEqual(compress_file(self.page, ["gzip"]), 0)
+        self.write(self.page, "<p>Bombadil</p>" * 100)
+        os.utime(self.page, ns=(1, 1))
+        self.assertEqual(compress_file(self.page, ["gzip"]), 1)
+
+    def test_removes_orphaned_siblings(self):
+        compress_tree(self.dest, ["gzip"])
+        os.remove(self.page)
+        compress_tree(self.dest, ["gzip"])
+        self.assertFalse(path.exists(self.page + ".gz"))
+
+    def test_keeps_compressed_assets(self):
+        asset = path.join(self.dest, "data.csv.gz")
+        self.write(asset, "not really gzip")
+        compress_tree(self.dest, ["gzip"])
+        self.assertTrue(path.exists(asset))
+
+    def test_removes_siblings_of_files_that_became_too_small(self):
+        compress_tree(self.dest, ["gzip"])
+        self.write(self.page, "<p>Tom</p>")
+        compress_tree(self.dest, ["gzip"])
+        self.assertFalse(path.exists(self.page + ".gz"))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            compress_tree(self.dest, ["zstd"])
+
+if __name__ == "__main__":
+    unittest.main()
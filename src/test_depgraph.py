@@ -0,0 +1,64 @@
+import unittest
+import tempfile
+from os import path
+
+from depgraph import DependencyGraph, resolve_reference, page_dependencies
+
+
+class TestResolveReference(unittest.TestCase):
+    def test_page_links(self):
+        self.assertEqual(resolve_reference("/", "content", "static"), path.join("content", "index.md"))
+        self.assertEqual(resolve_reference("/blog/tom", "content", "static"), path.join("content", "blog", "tom", "index.md"))
+        self.assertEqual(resolve_reference("/blog/tom/#intro", "content", "static"), path.join("content", "blog", "tom", "index.md"))
+        self.assertEqual(resolve_reference("/contact.html", "content", "static"), path.join("content", "contact.md"))
+
+    def test_assets(self):
+        self.assertEqual(resolve_reference("/images/tom.png", "content", "static"), path.join("static", "images", "tom.png"))
+
+    def test_external_and_relative(self):
+        self.assertIsNone(resolve_reference("https://boot.dev", "content", "static"))
+        self.assertIsNone(resolve_reference("//cdn.example.com/a.js", "content", "static"))
+        self.assertIsNone(resolve_reference("images/tom.png", "content", "static"))
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_affected_outputs(self):
+        graph = DependencyGraph()
+        graph.set_dependencies("docs/index.html", ["content/index.md", "template.html"])
+        graph.set_dependencies("docs/tom.html", ["content/tom.md", "template.html", "static/tom.png"])
+        self.assertEqual(graph.affected_outputs(["template.html"]), ["docs/index.html", "docs/tom.html"])
+        self.assertEqual(graph.affected_outputs(["static/tom.png"]), ["docs/tom.html"])
+        self.assertEqual(graph.affected_outputs(["static/other.png"]), [])
+
+    def test_set_dependencies_replaces_edges(self):
+        graph = DependencyGraph()
+        graph.set_dependencies("docs/tom.html", ["static/old.png"])
+        graph.set_dependencies("docs/tom.html", ["static/new.png"])
+        self.assertEqual(graph.affected_outputs(["static/old.png"]), [])
+
+    def test_retain_outputs(self):
+        graph = DependencyGraph()
+        graph.set_dependencies("docs/a.html", ["template.html"])
+        graph.set_dependencies("docs/b.html", ["template.html"])
+        graph.retain_outputs({"docs/a.html"})
+        self.assertEqual(graph.affected_outputs(["template.html"]), ["docs/a.html"])
+
+    def test_save_and_load(self):
+        graph = DependencyGraph()
+        graph.set_dependencies("docs/index.html", ["content/index.md", "template.html"])
+        with tempfile.TemporaryDirectory() as tmp:
+            graph_path = path.join(tmp, "deps", "dependencies.json")
+            graph.save(graph_path)
+            loaded = DependencyGraph.load(graph_path)
+        self.assertEqual(loaded.dependencies_of("docs/index.html"), ["content/index.md", "template.html"])
+
+    def test_page_dependencies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = path.join(tmp, "index.md")
+            with open(source, 'w') as f:
+                f.write("# Home\n\n![tom](/images/tom.png) and [tom](/blog/tom) and [out](https://boot.dev)\n")
+            dependencies = page_dependencies(source, "template.html", "content", "static")
+        self.assertEqual(dependencies, {source, "template.html", path.join("static", "images", "tom.png"), path.join("content", "blog", "tom", "index.md")})
+
+if __name__ == "__main__":
+    unittest.main()
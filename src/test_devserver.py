@@ -0,0 +1,72 @@
+import unittest
+import os
+from os import path
+
+from test_main import BuildTestCase
+from devserver import SiteWatcher, diff_snapshots, page_dest_path
+from main import generate_pages_recursive
+from manifest import new_manifest
+from assets import sync_files
+from depgraph import DependencyGraph
+
+
+class TestDiffSnapshots(unittest.TestCase):
+    def test_diff(self):
+        before = {"a.md": (1, 10), "b.md": (1, 10)}
+        after = {"a.md": (2, 10), "c.md": (1, 5)}
+        self.assertEqual(diff_snapshots(before, after), (["a.md", "c.md"], ["b.md"]))
+
+    def test_page_dest_path(self):
+        self.assertEqual(page_dest_path(path.join("content", "blog", "index.md"), "content", "docs"), path.join("docs", "blog", "index.html"))
+
+
+class TestSiteWatcher(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = path.join(self.root, "static")
+        os.makedirs(self.static)
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.write(path.join(self.content, "index.md"), "# Home")
+        self.write(path.join(self.content, "blog", "index.md"), "# Blog\n\n[home](/)")
+        self.write(path.join(self.static, "index.css"), "body {}")
+        self.manifest = new_manifest()
+        self.manifest["assets"] = sync_files(self.static, self.dest)
+        self.rebuild_all = lambda: generate_pages_recursive(self.content, self.template, self.dest, "/", self.manifest)
+        pages, _ = self.rebuild_all()
+        self.graph = DependencyGraph()
+        self.graph.update_pages(pages, self.template, self.content, self.static)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", self.manifest, self.rebuild_all, graph=self.graph)
+
+    def test_rebuilds_only_changed_page(self):
+        blog_html = path.join(self.dest, "blog", "index.html")
+        self.write(blog_html, "untouched")
+        self.write(path.join(self.content, "index.md"), "# Home again", mtime_ns=1)
+        self.watcher.rebuild(self.watcher.poll())
+        self.assertIn("Home again", self.read(path.join(self.dest, "index.html")))
+        self.assertEqual(self.read(blog_html), "untouched")
+
+    def test_removed_page_and_asset(self):
+        os.remove(path.join(self.content, "blog", "index.md"))
+        os.remove(path.join(self.static, "index.css"))
+        self.watcher.rebuild(self.watcher.poll())
+        self.assertFalse(path.exists(path.join(self.dest, "blog", "index.html")))
+        self.assertFalse(path.exists(path.join(self.dest, "index.css")))
+
+    def test_template_change_rebuilds_all(self):
+        self.write(self.template, "<article>{{ Content }}</article>", mtime_ns=1)
+        self.watcher.rebuild(self.watcher.poll())
+        self.assertTrue(self.read(path.join(self.dest, "blog", "index.html")).startswith("<article>"))
+
+    def test_broken_page_does_not_stop_rebuild(self):
+        self.write(path.join(self.content, "blog", "index.md"), "no title", mtime_ns=1)
+        self.write(path.join(self.static, "index.css"), "body { margin: 0 }", mtime_ns=1)
+        self.watcher.rebuild(self.watcher.poll())
+        self.assertEqual(self.read(path.join(self.dest, "index.css")), "body { margin: 0 }")
+
+    def test_reports_pages_referencing_changed_inputs(self):
+        self.write(path.join(self.content, "index.md"), "# Home again", mtime_ns=1)
+        self.watcher.rebuild(self.watcher.poll())
+        self.assertEqual(self.watcher.stale_references, [path.join(self.dest, "blog", "index.html")])
+
+if __name__ == "__main__":
+    unittest.main()
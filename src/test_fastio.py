@@ -0,0 +1,85 @@
+import unittest
+import errno
+import os
+import tempfile
+from os import path
+
+import fastio
+from fastio import read_text, read_markdown_title, copy_file
+
+
+class TestFastIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Force the mapped and kernel copy paths for these small fixtures
+        self.thresholds = (fastio.MMAP_THRESHOLD, fastio.KERNEL_COPY_THRESHOLD)
+        fastio.MMAP_THRESHOLD = 1
+        fastio.KERNEL_COPY_THRESHOLD = 1
+
+    def tearDown(self):
+        fastio.MMAP_THRESHOLD, fastio.KERNEL_COPY_THRESHOLD = self.thresholds
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        file_path = path.join(self.tmp.name, name)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return file_path
+
+    def test_mapped_read_matches_text_mode(self):
+        source = self.write("page.md", "Intro\r\n\r\n# Tolkien ü\r\n\r\nOld\rmac\n".encode())
+        with open(source, 'r') as f:
+            self.assertEqual(read_text(source), f.read())
+
+    def test_finds_title_anywhere(self):
+        self.assertEqual(read_markdown_title(self.write("a.md", b"# First\n\n# Second\n")), "First")
+        self.assertEqual(read_markdown_title(self.write("b.md", b"text\r\n\r\n# Later\r\nmore")), "Later")
+        self.assertIsNone(read_markdown_title(self.write("c.md", b"no #  title here\n## Sub\n")))
+
+    def test_copy_keeps_content_and_mtime(self):
+        source = self.write("logo.png", os.urandom(200000))
+        os.utime(source, ns=(1, 1000000000))
+        destination = path.join(self.tmp.name, "copy.png")
+        copy_file(source, destination)
+        with open(source, 'rb') as a, open(destination, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(os.stat(destination).st_mtime_ns, 1000000000)
+
+    def test_copy_falls_back_without_kernel_paths(self):
+        source = self.write("logo.png", os.urandom(100000))
+        kernel_copy = fastio.kernel_copy
+        fastio.kernel_copy = lambda source_fd, dest_fd, size: False
+        try:
+            copy_file(source, path.join(self.tmp.name, "copy.png"))
+        finally:
+            fastio.kernel_copy = kernel_copy
+        with open(source, 'rb') as a, open(path.join(self.tmp.name, "copy.png"), 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range") and hasattr(os, "sendfile"), "needs copy_file_range and sendfile")
+    def test_copy_falls_back_after_partial_kernel_copy(self):
+        source = self.write("logo.png", os.urandom(100000))
+        destination = path.join(self.tmp.name, "copy.png")
+        copy_file_range, sendfile = os.copy_file_range, os.sendfile
+        calls = []
+
+        def failing_sendfile(dest_fd, source_fd, offset, count):
+            calls.append(offset)
+            if len(calls) > 1:
+                raise OSError(errno.EINVAL, "unsupported")
+            return sendfile(dest_fd, source_fd, offset, 1000)
+
+        # Reporting nothing copied has to fall through, and a sendfile that stops midway must not leave a gap
+        os.copy_file_range = lambda *args: 0
+        os.sendfile = failing_sendfile
+        try:
+            copy_file(source, destination)
+        finally:
+            os.copy_file_range, os.sendfile = copy_file_range, sendfile
+        self.assertEqual(calls, [0, 1000])
+        with open(source, 'rb') as a, open(destination, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import json
+import os
+from os import path
+
+from test_main import BuildTestCase
+from main import generate_pages_recursive
+from manifest import new_manifest
+from fingerprint import fingerprint_assets, fingerprinted_path, rewrite_css
+from template import configure_asset_urls, rewrite_urls
+
+
+class TestRewriting(unittest.TestCase):
+    def tearDown(self):
+        configure_asset_urls(None)
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(path.join("images", "tom.png"), "0123456789abcdef"), path.join("images", "tom.0123456789ab.png"))
+
+    def test_rewrite_css(self):
+        asset_urls = {"/images/tom.png": "/images/tom.abc.png"}
+        css = "a { background: url('/images/tom.png'); } b { background: url(../images/tom.png#x); } c { background: url(https://example.com/tom.png); }"
+        self.assertEqual(
+            rewrite_css(css, "/css/site.css", asset_urls),
+            "a { background: url('/images/tom.abc.png'); } b { background: url(../images/tom.abc.png#x); } c { background: url(https://example.com/tom.png); }",
+        )
+
+    def test_rewrite_urls_before_basepath(self):
+        configure_asset_urls({"/index.css": "/index.abc.css"})
+        html = '<link href="/index.css?v=1"><a href="/index.css.map">map</a>'
+        self.assertEqual(rewrite_urls(html, "/site/"), '<link href="/site/index.abc.css?v=1"><a href="/site/index.css.map">map</a>')
+
+
+class TestFingerprintAssets(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = path.join(self.root, "static")
+        os.makedirs(path.join(self.static, "images"))
+        self.write(path.join(self.static, "images", "tom.png"), "png")
+        self.write(path.join(self.static, "index.css"), "body { background: url(/images/tom.png); }")
+        self.write(path.join(self.content, "index.md"), "# Home\n\n![Tom](/images/tom.png)")
+
+    def tearDown(self):
+        configure_asset_urls(None)
+        super().tearDown()
+
+    def test_pages_and_stylesheets_use_fingerprinted_names(self):
+        asset_urls, _ = fingerprint_assets(self.static, self.dest)
+        configure_asset_urls(asset_urls)
+        generate_pages_recursive(self.content, self.template, self.dest, "/")
+        image_url = asset_urls["/images/tom.png"]
+        self.assertIn(f'src="{image_url}"', self.read(path.join(self.dest, "index.html")))
+        self.assertIn(image_url, self.read(path.join(self.dest, asset_urls["/index.css"][1:])))
+        manifest = json.loads(self.read(path.join(self.dest, "asset-manifest.json")))
+        self.assertEqual(manifest["images/tom.png"], image_url[1:])
+
+    def test_changed_asset_renames_dependents(self):
+        first, assets = fingerprint_assets(self.static, self.dest, incremental=True)
+        self.write(path.join(self.static, "images", "tom.png"), "another png")
+        second, _ = fingerprint_assets(self.static, self.dest, assets, incremental=True)
+        self.assertNotEqual(first["/images/tom.png"], second["/images/tom.png"])
+        self.assertNotEqual(first["/index.css"], second["/index.css"])
+        self.assertFalse(path.exists(path.join(self.dest, first["/images/tom.png"][1:])))
+
+    def test_incremental_build_rebuilds_pages_when_assets_change(self):
+        manifest = new_manifest()
+        configure_asset_urls(fingerprint_assets(self.static, self.dest, incremental=True)[0])
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.write(path.join(self.static, "images", "tom.png"), "another png")
+        asset_urls, _ = fingerprint_assets(self.static, self.dest, incremental=True)
+        configure_asset_urls(asset_urls)
+        _, built_pages = generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.assertEqual(len(built_pages), 2)
+        self.assertIn(asset_urls["/images/tom.png"], self.read(path.join(self.dest, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
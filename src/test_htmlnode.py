@@ -1,4 +1,5 @@
 import unittest
+import io
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -12,6 +13,10 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode("p", "This is a value")
         self.assertEqual(node.value, "This is a value")
 
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(LeafNode("b", "Remember"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
     def test_props_to_html(self):
         node = HTMLNode("button", "Accept", props={ "disabled": "true" })
         self.assertEqual(node.props_to_html(), " disabled=\"true\"")
@@ -43,5 +48,27 @@ class TestParentNode(unittest.TestCase):
         node = ParentNode("div", [ParentNode("p", [LeafNode("b", "Remember")])])
         self.assertEqual(node.to_html(), "<div><p><b>Remember</b></p></div>")
 
+    def test_missing_tag(self):
+        node = ParentNode(None, [LeafNode("b", "Remember")])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+class TestStreamingHTML(unittest.TestCase):
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "Go "), LeafNode("a", "home", { "href": "/" })]), LeafNode("hr", "")])
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "One")]), ParentNode("li", [LeafNode("i", "Two")])])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<ul><li>One</li><li><i>Two</i></li></ul>")
+
+    def test_deep_nesting(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        self.assertEqual(len(node.to_html()), 5000 * len("<span></span>") + len("deep"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import tempfile
+from os import path
+
+from linkcheck import build_output_index, check_page_links, output_urls
+
+
+class TestOutputIndex(unittest.TestCase):
+    def test_output_urls(self):
+        self.assertEqual(output_urls(path.join("docs", "index.html"), "docs"), ["/index.html", "/"])
+        self.assertEqual(output_urls(path.join("docs", "blog", "tom", "index.html"), "docs"), ["/blog/tom/index.html", "/blog/tom/", "/blog/tom"])
+        self.assertEqual(output_urls(path.join("docs", "images", "tom.png"), "docs"), ["/images/tom.png"])
+
+
+class TestCheckPageLinks(unittest.TestCase):
+    def test_reports_broken_references_with_lines(self):
+        index = build_output_index("docs", [path.join("docs", "index.html"), path.join("docs", "blog", "tom", "index.html"), path.join("docs", "images", "tom.png")])
+        with tempfile.TemporaryDirectory() as tmp:
+            source = path.join(tmp, "index.md")
+            with open(source, 'w') as f:
+                f.write("# Home\n\n[home](/) [tom](/blog/tom#intro) ![tom](/images/tom.png)\n\n[gone](/blog/gone) [ext](https://boot.dev)\n![missing](/images/missing.png)\n")
+            broken = check_page_links(source, index)
+        self.assertEqual(broken, [(source, 5, "link", "/blog/gone"), (source, 6, "image", "/images/missing.png")])
+
+    def test_skips_code_blocks_and_joins_wrapped_links(self):
+        index = build_output_index("docs", [path.join("docs", "index.html")])
+        with tempfile.TemporaryDirectory() as tmp:
+            source = path.join(tmp, "index.md")
+            with open(source, 'w') as f:
+                f.write("# Home\n\n```\n[docs](/not-a-page)\n\n```\n\nSee [the\nmissing docs](/docs) here\n")
+            broken = check_page_links(source, index)
+        self.assertEqual(broken, [(source, 8, "link", "/docs")])
+
+if __name__ == "__main__":
+    unittest.main()
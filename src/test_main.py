@@ -0,0 +1,125 @@
+import unittest
+import os
+import tempfile
+from os import path
+
+from main import discover_pages, generate_pages_recursive
+from manifest import new_manifest
+from profiler import BuildProfiler
+import iopipeline
+import usecases
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class BuildTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = path.join(self.root, "content")
+        self.dest = path.join(self.root, "docs")
+        self.template = path.join(self.root, "template.html")
+        os.makedirs(path.join(self.content, "blog"))
+        self.write(self.template, TEMPLATE)
+        self.write(path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, file_path, text, mtime_ns=None):
+        with open(file_path, 'w') as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+    def read(self, file_path):
+        with open(file_path, 'r') as f:
+            return f.read()
+
+
+class TestDiscoverPages(BuildTestCase):
+    def test_discover_pages(self):
+        pages = discover_pages(self.content, self.dest)
+        self.assertEqual(
+            pages,
+            [
+                (path.join(self.content, "blog", "index.md"), path.join(self.dest, "blog", "index.html")),
+                (path.join(self.content, "index.md"), path.join(self.dest, "index.html")),
+            ],
+        )
+
+
+class TestIncrementalBuild(BuildTestCase):
+    def test_skips_unchanged_pages(self):
+        manifest = new_manifest()
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        index_html = path.join(self.dest, "index.html")
+        self.write(index_html, "untouched")
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.assertEqual(self.read(index_html), "untouched")
+
+    def test_rebuilds_changed_page(self):
+        manifest = new_manifest()
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.write(path.join(self.content, "index.md"), "# Home\n\nWelcome back")
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.assertIn("Welcome back", self.read(path.join(self.dest, "index.html")))
+
+    def test_rebuilds_when_basepath_changes(self):
+        manifest = new_manifest()
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        index_html = path.join(self.dest, "index.html")
+        self.write(index_html, "stale")
+        generate_pages_recursive(self.content, self.template, self.dest, "/site/", manifest)
+        self.assertNotEqual(self.read(index_html), "stale")
+
+    def test_removes_outputs_of_deleted_sources(self):
+        manifest = new_manifest()
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        os.remove(path.join(self.content, "blog", "index.md"))
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.assertFalse(path.exists(path.join(self.dest, "blog", "index.html")))
+        self.assertTrue(path.exists(path.join(self.dest, "index.html")))
+
+
+class TestParallelBuild(BuildTestCase):
+    def test_parallel_matches_serial(self):
+        serial_dest = path.join(self.root, "serial")
+        generate_pages_recursive(self.content, self.template, serial_dest, "/", jobs=1)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", jobs=2)
+        for relative in (path.join("blog", "index.html"), "index.html"):
+            self.assertEqual(self.read(path.join(self.dest, relative)), self.read(path.join(serial_dest, relative)))
+
+    def test_parallel_failure_names_page(self):
+        self.write(path.join(self.content, "blog", "index.md"), "No title here")
+        with self.assertRaises(RuntimeError) as context:
+            generate_pages_recursive(self.content, self.template, self.dest, "/", jobs=2)
+        self.assertIn(path.join("blog", "index.md"), str(context.exception))
+
+
+class TestPipelinedBuild(BuildTestCase):
+    def test_pipelined_matches_serial(self):
+        serial_dest = path.join(self.root, "serial")
+        generate_pages_recursive(self.content, self.template, serial_dest, "/", io_threads=0)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", io_threads=2)
+        for relative in (path.join("blog", "index.html"), "index.html"):
+            self.assertEqual(self.read(path.join(self.dest, relative)), self.read(path.join(serial_dest, relative)))
+
+    def test_pipelined_profiles_streamed_pages(self):
+        profiler = BuildProfiler()
+        thresholds = (iopipeline.STREAMING_THRESHOLD, usecases.STREAMING_THRESHOLD)
+        iopipeline.STREAMING_THRESHOLD = usecases.STREAMING_THRESHOLD = 1
+        try:
+            generate_pages_recursive(self.content, self.template, self.dest, "/", profiler=profiler, io_threads=2)
+        finally:
+            iopipeline.STREAMING_THRESHOLD, usecases.STREAMING_THRESHOLD = thresholds
+        self.assertEqual(sorted(profile.source for profile in profiler.pages), sorted([path.join(self.content, "index.md"), path.join(self.content, "blog", "index.md")]))
+
+    def test_pipelined_failure_propagates(self):
+        self.write(path.join(self.content, "index.md"), "No title here")
+        with self.assertRaises(Exception):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", io_threads=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import json
+import tempfile
+from os import path
+
+from metrics import BuildMetrics
+
+
+class TestBuildMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = path.join(self.tmp.name, "index.md")
+        self.dest = path.join(self.tmp.name, "index.html")
+        with open(self.source, 'w') as f:
+            f.write("# Tolkien\n")
+        with open(self.dest, 'w') as f:
+            f.write("<h1>Tolkien</h1>")
+        self.metrics = BuildMetrics()
+        with self.metrics.phase("pages"):
+            self.metrics.record_pages([(self.source, self.dest), ("other.md", "other.html")], [(self.source, self.dest)])
+        self.metrics.count("files_copied", 3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_counts_pages_and_bytes(self):
+        values = self.metrics.snapshot()
+        self.assertEqual(values["pages_total"], 2)
+        self.assertEqual(values["pages_rendered"], 1)
+        self.assertEqual(values["pages_skipped"], 1)
+        self.assertEqual(values["bytes_read"], 10)
+        self.assertEqual(values["bytes_written"], 16)
+        self.assertEqual(values["files_copied"], 3)
+        self.assertIn("pages", values["phase_seconds"])
+
+    def test_writes_json_by_extension(self):
+        metrics_path = path.join(self.tmp.name, "out", "metrics.json")
+        self.metrics.write(metrics_path)
+        with open(metrics_path) as f:
+            values = json.load(f)
+        self.assertEqual(values["pages_rendered"], 1)
+        self.assertGreater(values["peak_rss_bytes"], 0)
+
+    def test_writes_prometheus_text(self):
+        metrics_path = path.join(self.tmp.name, "metrics.prom")
+        self.metrics.write(metrics_path)
+        with open(metrics_path) as f:
+            text = f.read()
+        self.assertIn("# TYPE ssg_build_pages_rendered gauge\nssg_build_pages_rendered 1\n", text)
+        self.assertIn('ssg_build_phase_seconds{phase="pages"} ', text)
+        self.assertFalse(path.exists(metrics_path + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import tarfile
+import zipfile
+from os import path
+
+from test_main import BuildTestCase
+from main import generate_pages_recursive, copy_files_recursively
+from output import MemoryOutput, ArchiveOutput, FileSystemOutput, configure_output
+
+
+class OutputTestCase(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = path.join(self.root, "static")
+        os.makedirs(path.join(self.static, "images"))
+        self.write(path.join(self.static, "images", "logo.png"), "png")
+
+    def tearDown(self):
+        configure_output(FileSystemOutput())
+        super().tearDown()
+
+    def build(self, output, jobs=1):
+        configure_output(output)
+        copy_files_recursively(self.static, self.dest)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", jobs=jobs)
+        output.close()
+
+
+class TestMemoryOutput(OutputTestCase):
+    def test_build_stays_in_memory(self):
+        output = MemoryOutput()
+        self.build(output)
+        self.assertFalse(path.exists(self.dest))
+        self.assertIn("<h1>Blog</h1>", output.read_text(path.join(self.dest, "blog", "index.html")))
+        self.assertEqual(output.files[path.join(self.dest, "images", "logo.png")], b"png")
+
+    def test_parallel_workers_hand_pages_to_parent(self):
+        output = MemoryOutput()
+        self.build(output, jobs=2)
+        self.assertIn("<h1>Home</h1>", output.read_text(path.join(self.dest, "index.html")))
+        self.assertIn("<h1>Blog</h1>", output.read_text(path.join(self.dest, "blog", "index.html")))
+
+
+class TestArchiveOutput(OutputTestCase):
+    def test_tar_archive(self):
+        archive_path = path.join(self.root, "site.tar.gz")
+        self.build(ArchiveOutput(archive_path, self.dest))
+        self.assertFalse(path.exists(self.dest))
+        with tarfile.open(archive_path) as archive:
+            self.assertEqual(sorted(archive.getnames()), ["blog/index.html", "images/logo.png", "index.html"])
+            self.assertIn(b"<h1>Home</h1>", archive.extractfile("index.html").read())
+
+    def test_zip_archive(self):
+        archive_path = path.join(self.root, "site.zip")
+        self.build(ArchiveOutput(archive_path, self.dest))
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(sorted(archive.namelist()), ["blog/index.html", "images/logo.png", "index.html"])
+            self.assertEqual(archive.read("images/logo.png"), b"png")
+
+    def test_rejects_paths_outside_root(self):
+        output = ArchiveOutput(path.join(self.root, "site.tar"), self.dest)
+        with self.assertRaises(ValueError):
+            output.write_bytes(path.join(self.root, "elsewhere.html"), b"")
+        output.close()
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            ArchiveOutput(path.join(self.root, "site.rar"), self.dest)
+
+
+if __name__ == "__main__":
+    unittest.main()
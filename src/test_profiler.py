@@ -0,0 +1,47 @@
+import unittest
+import json
+
+from profiler import BuildProfiler, PageProfile, PAGE_STAGES
+from usecases import markdown_to_html_node
+
+
+class TestPageProfile(unittest.TestCase):
+    def test_stage_accumulates(self):
+        profile = PageProfile("index.md")
+        with profile.stage("read"):
+            pass
+        with profile.stage("read"):
+            pass
+        self.assertEqual(list(profile.stages), ["read"])
+        self.assertGreaterEqual(profile.total, 0)
+
+    def test_markdown_to_html_node_records_stages(self):
+        profile = PageProfile("index.md")
+        markdown_to_html_node("# Title\n\nSome **text**", profile)
+        self.assertEqual(sorted(profile.stages), ["classify", "inline", "split"])
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_summary(self):
+        profiler = BuildProfiler()
+        for source, seconds in (("a.md", 0.5), ("b.md", 2.0)):
+            profile = PageProfile(source)
+            profile.stages["inline"] = seconds
+            profile.bytes_read = 100
+            profiler.add_page(profile)
+        summary = profiler.summary(slowest=1)
+        self.assertEqual(summary["pages"], 2)
+        self.assertEqual(summary["bytes_read"], 200)
+        self.assertEqual(summary["stages"]["inline"], 2.5)
+        self.assertEqual(list(summary["stages"]), list(PAGE_STAGES))
+        self.assertEqual([page["source"] for page in summary["slowest_pages"]], ["b.md"])
+
+    def test_json_report(self):
+        profiler = BuildProfiler()
+        with profiler.phase("static"):
+            pass
+        report = json.loads(profiler.report("json"))
+        self.assertIn("static", report["phases"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from os import path
+
+from test_main import BuildTestCase
+from main import discover_pages, generate_pages_recursive
+from shard import parse_shard, shard_of, prepare_shard_output, write_shard_manifest, merge_shards
+
+
+class TestShardSelection(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shard_is_independent_of_checkout_location(self):
+        relative = shard_of("content/blog/post.md", "content", 7)
+        self.assertEqual(shard_of("/ci/work/site/content/blog/post.md", "/ci/work/site/content", 7), relative)
+        self.assertTrue(1 <= relative <= 7)
+
+
+class TestShardedBuild(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ("a", "b", "c", "d"):
+            self.write(path.join(self.content, "blog", f"{name}.md"), f"# Post {name}")
+        self.shards = path.join(self.root, "shards")
+
+    def build_shard(self, index, count):
+        output_dir = prepare_shard_output(self.shards, index, count)
+        pages, _ = generate_pages_recursive(self.content, self.template, output_dir, "/", shard=(index, count))
+        write_shard_manifest(self.shards, index, count, pages, self.template, "/", self.dest)
+        return pages
+
+    def test_shards_partition_pages(self):
+        built = []
+        for index in (1, 2, 3):
+            built.extend(from_path for from_path, _ in self.build_shard(index, 3))
+        self.assertEqual(sorted(built), sorted(from_path for from_path, _ in discover_pages(self.content, self.dest)))
+
+    def test_merge_matches_single_build(self):
+        for index in (1, 2):
+            self.build_shard(index, 2)
+        pages = discover_pages(self.content, self.dest)
+        merged = merge_shards(self.shards, 2, pages, self.dest, self.template, "/")
+        self.assertEqual(sorted(merged), sorted(from_path for from_path, _ in pages))
+        for from_path, dest_path in pages:
+            self.assertEqual(merged[from_path]["dest_path"], dest_path)
+            self.assertTrue(path.exists(dest_path))
+        self.assertIn("<h1>Post c</h1>", self.read(path.join(self.dest, "blog", "c.html")))
+
+    def test_merge_requires_every_shard(self):
+        self.build_shard(1, 2)
+        with self.assertRaises(FileNotFoundError):
+            merge_shards(self.shards, 2, discover_pages(self.content, self.dest), self.dest, self.template, "/")
+
+    def test_merge_rejects_changed_template(self):
+        for index in (1, 2):
+            self.build_shard(index, 2)
+        self.write(self.template, "<main>{{ Content }}</main>{{ Title }}")
+        with self.assertRaises(ValueError):
+            merge_shards(self.shards, 2, discover_pages(self.content, self.dest), self.dest, self.template, "/")
+
+
+if __name__ == "__main__":
+    unittest.main()
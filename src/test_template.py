@@ -0,0 +1,75 @@
+import unittest
+import io
+import os
+import tempfile
+
+from template import Template, configure_asset_urls, load_template, rewrite_basepath
+
+
+class TestTemplate(unittest.TestCase):
+    def test_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.render({"Title": "Home", "Content": "<p>Hi</p>"}), "<title>Home</title><main><p>Hi</p></main>")
+
+    def test_render_custom_slot(self):
+        template = Template("<p>{{ Author }} wrote {{ Title }}</p>")
+        self.assertEqual(template.render({"Author": "Tolkien", "Title": "The Hobbit"}), "<p>Tolkien wrote The Hobbit</p>")
+
+    def test_render_unknown_slot_untouched(self):
+        template = Template("<p>{{Title}} {{ Missing }}</p>")
+        self.assertEqual(template.render({"Title": "Home"}), "<p>Home {{ Missing }}</p>")
+
+    def test_write_streams_chunks(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        buffer = io.StringIO()
+        template.write(buffer, {"Title": "Home", "Content": iter(["<p>", "Hi", "</p>"])})
+        self.assertEqual(buffer.getvalue(), "<title>Home</title><main><p>Hi</p></main>")
+
+    def test_write_repeated_slot(self):
+        template = Template("<main>{{ Content }}</main><aside>{{ Content }}</aside>").with_basepath("/site/")
+        buffer = io.StringIO()
+        template.write(buffer, {"Content": (chunk for chunk in ["<p>", "Hi", "</p>"])})
+        self.assertEqual(buffer.getvalue(), "<main><p>Hi</p></main><aside><p>Hi</p></aside>")
+        self.assertEqual(template.render({"Content": iter(["Hi"])}), "<main>Hi</main><aside>Hi</aside>")
+
+    def test_with_basepath(self):
+        template = Template("<link href=\"/index.css\" /><main>{{ Content }}</main>").with_basepath("/site/")
+        self.assertEqual(template.render({"Content": "<a href=\"/x\">x</a>"}), "<link href=\"/site/index.css\" /><main><a href=\"/x\">x</a></main>")
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(rewrite_basepath("<img src=\"/a.png\"></img>", "/site/"), "<img src=\"/site/a.png\"></img>")
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def test_load_template_is_cached_until_modified(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, 'w') as f:
+                f.write("<p>{{ Title }}</p>")
+            first = load_template(template_path)
+            self.assertIs(load_template(template_path), first)
+            with open(template_path, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(template_path, ns=(0, 0))
+            self.assertEqual(load_template(template_path).render({"Title": "Home"}), "<h1>Home</h1>")
+
+    def test_asset_urls_only_invalidate_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, 'w') as f:
+                f.write("<link href=\"/index.css\" />{{ Content }}")
+            first = load_template(template_path)
+            configure_asset_urls(None)
+            self.assertIs(load_template(template_path), first)
+            configure_asset_urls({"/index.css": "/index.abc.css"})
+            try:
+                self.assertEqual(load_template(template_path).render({"Content": ""}), "<link href=\"/index.abc.css\" />")
+            finally:
+                configure_asset_urls(None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
 import unittest
+import os
+import tempfile
 
 from textnode import TextNode, TextType
 from blocknode import BlockType
-from usecases import text_node_to_html_node, split_nodes_delimiter, split_nodes_image, split_nodes_link, extract_markdown_links, extract_markdown_images, text_to_textnodes, markdown_to_blocks, block_to_block_type, markdown_to_html_node, extract_title
+from profiler import PageProfile
+import usecases
+from usecases import scan_blocks, iter_markdown_html, generate_page, generate_page_streaming, text_node_to_html_node, split_nodes_delimiter, split_nodes_image, split_nodes_link, extract_markdown_links, extract_markdown_images, text_to_textnodes, markdown_to_blocks, block_to_block_type, markdown_to_html_node, extract_title
 
 
 class TestTextToHTMLNode(unittest.TestCase):
@@ -331,6 +335,59 @@ class TestTextToTextNodes(unittest.TestCase):
             new_nodes,
         )
 
+    def test_text_to_text_nodes_repeated_link(self):
+        input = "[home](/) and again [home](/)"
+        new_nodes = text_to_textnodes(input)
+        self.assertListEqual(
+            [
+                TextNode("home", TextType.LINK, "/"),
+                TextNode(" and again ", TextType.NORMAL),
+                TextNode("home", TextType.LINK, "/"),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_text_nodes_underscore_in_url(self):
+        input = "A [snake_case link](https://example.com/snake_case_page) _here_"
+        new_nodes = text_to_textnodes(input)
+        self.assertListEqual(
+            [
+                TextNode("A ", TextType.NORMAL),
+                TextNode("snake_case link", TextType.LINK, "https://example.com/snake_case_page"),
+                TextNode(" ", TextType.NORMAL),
+                TextNode("here", TextType.ITALIC),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_text_nodes_unclosed_delimiter(self):
+        input = "2 ** 3 is eight, see snake_case"
+        new_nodes = text_to_textnodes(input)
+        self.assertListEqual([TextNode("2 ** 3 is eight, see snake_case", TextType.NORMAL)], new_nodes)
+
+    def test_text_to_text_nodes_link_inside_bold(self):
+        input = "**Read [the docs](/docs)**"
+        new_nodes = text_to_textnodes(input)
+        self.assertListEqual(
+            [
+                TextNode("Read ", TextType.BOLD),
+                TextNode("the docs", TextType.LINK, "/docs"),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_text_nodes_image_inside_italic(self):
+        input = "_see ![img](/a.png) here_"
+        new_nodes = text_to_textnodes(input)
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.ITALIC),
+                TextNode("img", TextType.IMAGE, "/a.png"),
+                TextNode(" here", TextType.NORMAL),
+            ],
+            new_nodes,
+        )
+
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
         md = """
@@ -394,6 +451,21 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_markdown_to_blocks_fenced_code_with_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["Intro", "```\nfirst\n\nsecond\n```", "Outro"])
+
+    def test_markdown_to_blocks_unclosed_fence(self):
+        md = "```\nfirst\n\nsecond"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["```\nfirst", "second"])
+
+class TestScanBlocks(unittest.TestCase):
+    def test_scan_blocks_from_file_lines(self):
+        lines = ["# Title\n", "\n", "1. One\n", "2. Two\n"]
+        self.assertEqual(list(scan_blocks(lines)), [["# Title"], ["1. One", "2. Two"]])
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading_blocks(self):
         self.assertEqual(block_to_block_type("# Heading 1"), BlockType.HEADING)
@@ -524,6 +596,11 @@ the **same** even with inline stuff
             "<div><h1>Title</h1><p>Paragraph text here.</p><ul><li>List item 1</li><li>List item 2</li></ul><blockquote>Quote block</blockquote><ol><li>First</li><li>Second</li></ol></div>",
         )
 
+    def test_codeblock_with_blank_line(self):
+        md = "```\nfirst\n\nsecond\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(node.to_html(), "<div><pre><code>first\n\nsecond</code></pre></div>")
+
 
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title(self):
@@ -546,5 +623,44 @@ class TestExtractTitle(unittest.TestCase):
         title = extract_title(md)
         self.assertEqual(title, "Title")
 
+class TestStreamingPipeline(unittest.TestCase):
+    MARKDOWN = "# Title\n\nSome [link](/blog) text\n\n```\ncode\n\nmore\n```\n\n1. One\n2. Two\n"
+
+    def test_iter_markdown_html_matches_tree(self):
+        lines = self.MARKDOWN.splitlines(keepends=True)
+        self.assertEqual("".join(iter_markdown_html(lines)), markdown_to_html_node(self.MARKDOWN).to_html())
+
+    def test_generate_page_streaming_matches_generate_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "index.md")
+            template = os.path.join(tmp, "template.html")
+            with open(source, 'w') as f:
+                f.write(self.MARKDOWN)
+            with open(template, 'w') as f:
+                f.write("<title>{{ Title }}</title><link href=\"/index.css\" />{{ Content }}")
+            generate_page(source, template, os.path.join(tmp, "a.html"), "/site/", log=lambda message: None)
+            generate_page_streaming(source, template, os.path.join(tmp, "b.html"), "/site/")
+            with open(os.path.join(tmp, "a.html")) as a, open(os.path.join(tmp, "b.html")) as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_profiled_large_page_streams(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "index.md")
+            template = os.path.join(tmp, "template.html")
+            with open(source, 'w') as f:
+                f.write(self.MARKDOWN)
+            with open(template, 'w') as f:
+                f.write("{{ Title }}{{ Content }}")
+            profile = PageProfile(source)
+            threshold = usecases.STREAMING_THRESHOLD
+            usecases.STREAMING_THRESHOLD = 1
+            try:
+                generate_page(source, template, os.path.join(tmp, "a.html"), "/", log=lambda message: None, profile=profile)
+            finally:
+                usecases.STREAMING_THRESHOLD = threshold
+            self.assertIn("stream", profile.stages)
+            self.assertEqual(profile.bytes_read, len(self.MARKDOWN))
+            self.assertEqual(profile.bytes_written, os.path.getsize(os.path.join(tmp, "a.html")))
+
 if __name__ == "__main__":
     unittest.main()
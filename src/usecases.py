@@ -1,10 +1,22 @@
-from os import mkdir
 from textnode import TextType, TextNode
 from blocknode import BlockType
 from htmlnode import LeafNode, ParentNode
+from template import load_template, rewrite_urls
+from profiler import NULL_PROFILE
+from blockcache import active_block_cache
+from buildlog import info
+from fastio import read_text, read_markdown_title
+from output import active_output
 import re
 import os
 
+# Every pattern is compiled once here instead of being looked up in re's cache on each call
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_MARKERS = re.compile(r"[!\[*_`]")
+INLINE_LINK = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+ORDERED_ITEM_PATTERN = re.compile(r"\d+\. ")
+
 def text_node_to_html_node(text_node):
     match text_node.text_type:
         case TextType.NORMAL:
@@ -77,60 +89,198 @@ def split_nodes_link(old_nodes):
     return result
 
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return LINK_PATTERN.findall(text)
+
+INLINE_DELIMITERS = { '**': TextType.BOLD, '_': TextType.ITALIC, '`': TextType.CODE }
 
 def text_to_textnodes(input):
-    result = [TextNode(input, TextType.NORMAL)]
-    result = split_nodes_link(result)
-    result = split_nodes_image(result)
-    result = split_nodes_delimiter(result, '**', TextType.BOLD)
-    result = split_nodes_delimiter(result, '_', TextType.ITALIC)
-    result = split_nodes_delimiter(result, '`', TextType.CODE)
+    # Single left-to-right scan: jump between marker characters and emit each span once,
+    # instead of re-splitting the whole node list once per inline type
+    result = []
+    text_start = 0
+    pos = 0
+    unclosed = set()
+    # Delimiters whose span was cut short by a link or image; their closer is dropped when reached
+    dangling = set()
+    # Next link or image at or after the scan position, advanced lazily so the lookups stay linear
+    link = INLINE_LINK.search(input)
+    while True:
+        marker = INLINE_MARKERS.search(input, pos)
+        if marker is None:
+            break
+        pos = marker.start()
+        char = input[pos]
+        node = None
+        end = pos + 1
+        if char == '!':
+            match = INLINE_LINK.match(input, pos + 1)
+            if match is not None:
+                node = TextNode(match.group(1), TextType.IMAGE, match.group(2))
+                end = match.end()
+        elif char == '[':
+            match = INLINE_LINK.match(input, pos)
+            if match is not None and (pos == 0 or input[pos - 1] != '!'):
+                node = TextNode(match.group(1), TextType.LINK, match.group(2))
+                end = match.end()
+        else:
+            delimiter = '**' if char == '*' else char
+            if input.startswith(delimiter, pos) and delimiter in dangling:
+                dangling.discard(delimiter)
+                if pos > text_start:
+                    result.append(TextNode(input[text_start:pos], TextType.NORMAL))
+                text_start = end = pos + len(delimiter)
+            elif input.startswith(delimiter, pos) and delimiter not in unclosed:
+                start = pos + len(delimiter)
+                close = input.find(delimiter, start)
+                if link is not None and link.start() < start:
+                    link = INLINE_LINK.search(input, start)
+                if close == -1:
+                    # Nothing further on can close this delimiter, so never search for it again
+                    unclosed.add(delimiter)
+                elif link is not None and link.start() < close:
+                    # Links and images bind tighter, so the span ends where the link begins
+                    stop = link.start() - 1 if link.start() > start and input[link.start() - 1] == '!' else link.start()
+                    if pos > text_start:
+                        result.append(TextNode(input[text_start:pos], TextType.NORMAL))
+                    if stop > start:
+                        result.append(TextNode(input[start:stop], INLINE_DELIMITERS[delimiter]))
+                    if link.end() <= close:
+                        dangling.add(delimiter)
+                    text_start = end = stop
+                elif close > start:
+                    node = TextNode(input[pos + len(delimiter):close], INLINE_DELIMITERS[delimiter])
+                    end = close + len(delimiter)
+                else:
+                    end = pos + 2 * len(delimiter)
+        if node is not None:
+            if pos > text_start:
+                result.append(TextNode(input[text_start:pos], TextType.NORMAL))
+            result.append(node)
+            text_start = end
+        pos = end
+    if text_start < len(input) or not result:
+        result.append(TextNode(input[text_start:], TextType.NORMAL))
     return result
 
 def markdown_to_blocks(md):
-    blocks = []
-    lines = md.split('\n\n')
+    return ['\n'.join(lines) for lines in scan_blocks(md.split('\n'))]
+
+def trim_block_lines(lines):
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
+
+def is_closed_fence_line(line):
+    line = line.strip()
+    return len(line) >= 6 and line.startswith('```') and line.endswith('```')
+
+def scan_blocks(lines):
+    # One pass over the lines, grouping them into blocks at blank lines.
+    # A block opened by ``` keeps its blank lines until the closing fence.
+    block = []
+    in_fence = False
     for line in lines:
-        line = line.strip()
-        if line != "":
-            blocks.append(line)
-    return blocks
+        line = line.rstrip('\n')
+        if in_fence:
+            block.append(line)
+            if line.rstrip().endswith('```'):
+                in_fence = False
+            continue
+        if not line.strip():
+            if block:
+                yield trim_block_lines(block)
+                block = []
+            continue
+        if not block and line.lstrip().startswith('```') and not is_closed_fence_line(line):
+            in_fence = True
+        block.append(line)
+    if not block:
+        return
+    if not in_fence:
+        yield trim_block_lines(block)
+        return
+    # The fence never closed, so fall back to plain blank line separation
+    pending = []
+    for line in block:
+        if line.strip():
+            pending.append(line)
+        elif pending:
+            yield trim_block_lines(pending)
+            pending = []
+    if pending:
+        yield trim_block_lines(pending)
+
+def heading_level(line):
+    level = 0
+    while level < len(line) and line[level] == '#':
+        level += 1
+    return level
 
 def is_ordered_list(text):
-    lines = text.split('\n')
+    return is_ordered_list_lines(text.split('\n'))
+
+def is_ordered_list_lines(lines):
     for i, line in enumerate(lines):
-        expected_num = i + 1
-        if not re.match(f'^{expected_num}\\. ', line):
+        if not line.startswith(f'{i + 1}. '):
             return False
     return True
 
-def block_to_block_type(md_block):
-    if re.match(r'^#{1,6} ', md_block) is not None:
-        return BlockType.HEADING
-    if re.match(r'^```[\s\S]*```$', md_block, re.DOTALL) is not None:
-        return BlockType.CODE
-    if re.match(r'^> .*(\n>.*)*$', md_block) is not None:
-        return BlockType.QUOTE
-    if re.match(r'^- .*(\n- .*)*$', md_block) is not None:
-        return BlockType.UNORDERED_LIST
-    if is_ordered_list(md_block):
-        return BlockType.ORDERED_LIST
+def block_lines_to_block_type(lines):
+    first = lines[0]
+    if first.startswith('#'):
+        level = heading_level(first)
+        if level <= 6 and first[level:level + 1] == ' ':
+            return BlockType.HEADING
+    if first.startswith('```'):
+        last = lines[-1]
+        if last.endswith('```') and (len(lines) > 1 or len(first) >= 6):
+            return BlockType.CODE
+    if first.startswith('> '):
+        if all(line.startswith('>') for line in lines[1:]):
+            return BlockType.QUOTE
+    elif first.startswith('- '):
+        if all(line.startswith('- ') for line in lines[1:]):
+            return BlockType.UNORDERED_LIST
+    elif first.startswith('1. '):
+        if is_ordered_list_lines(lines):
+            return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def block_to_block_type(md_block):
+    return block_lines_to_block_type(md_block.split('\n'))
+
+def markdown_to_html_node(markdown, profile=NULL_PROFILE, cache=None):
+    with profile.stage("split"):
+        blocks = list(scan_blocks(markdown.split('\n')))
+    with profile.stage("classify"):
+        block_types = [block_lines_to_block_type(lines) for lines in blocks]
     html_blocks = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        html_block = block_node_to_html_node(block_type, block)
-        if html_block is not None:
-            html_blocks.append(html_block)
+    with profile.stage("inline"):
+        for block_type, lines in zip(block_types, blocks):
+            html_block = lines_to_html_node(block_type, lines, cache)
+            if html_block is not None:
+                html_blocks.append(html_block)
     return ParentNode("div", html_blocks)
 
+def lines_to_html_node(block_type, lines, cache=None):
+    if cache is not None:
+        block = '\n'.join(lines)
+        if cache.cacheable(block):
+            return cached_block_to_html_node(cache, block_type, block, lines)
+    return block_node_to_html_node(block_type, None, lines)
+
+def cached_block_to_html_node(cache, block_type, block, lines=None):
+    html = cache.get(block_type, block)
+    if html is None:
+        html_block = block_node_to_html_node(block_type, block, lines)
+        cache.put(block_type, block, html_block.to_html() if html_block is not None else "")
+        return html_block
+    # Cached blocks come back already serialized, so they are emitted as a raw leaf
+    return LeafNode(None, html) if html else None
+
 def text_to_children(text):
     children = []
     text_nodes = text_to_textnodes(text)
@@ -139,43 +289,41 @@ def text_to_children(text):
         children.append(html_node)
     return children
 
-def block_node_to_html_node(block_type, content):
+# Bump whenever block_node_to_html_node output changes, so cached blocks from older builds are not reused
+PARSER_VERSION = 1
+
+def block_node_to_html_node(block_type, content, lines=None):
+    # Callers that already hold the block's lines pass them to skip re-splitting the content
     if block_type == BlockType.CODE:
-        lines = content.strip().split('\n')
+        lines = lines if lines is not None else content.strip().split('\n')
         if lines[0].startswith('```'):
-            # Remove language if present
-            if len(lines[0]) > 3:
-                lines = lines[1:]
-            else:
-                lines = lines[1:]
+            lines = lines[1:]
         if lines and lines[-1].startswith('```'):
             lines = lines[:-1]
         code_text = '\n'.join(lines)
         return ParentNode("pre", [LeafNode("code", code_text)])
 
     if block_type == BlockType.HEADING:
-        heading_level = 0
-        for char in content:
-            if char == '#':
-                heading_level += 1
-            else:
-                break
+        if content is None:
+            content = '\n'.join(lines)
+        level = heading_level(content)
         # Must be followed by a space
-        if len(content) > heading_level and content[heading_level] == ' ':
-            heading_text = content[heading_level+1:].strip()
-            return ParentNode(f"h{heading_level}", text_to_children(heading_text))
+        if len(content) > level and content[level] == ' ':
+            heading_text = content[level+1:].strip()
+            return ParentNode(f"h{level}", text_to_children(heading_text))
         else:
             # Not a valid heading, treat as paragraph
             return ParentNode("p", text_to_children(content.strip()))
 
-    if block_type == BlockType.QUOTE:
+    if lines is None:
         lines = content.splitlines()
+
+    if block_type == BlockType.QUOTE:
         clean_lines = [line[2:] if line.startswith('> ') else (line[1:] if line.startswith('>') else line) for line in lines]
         clean_text = '\n'.join(clean_lines)
         return ParentNode("blockquote", text_to_children(clean_text))
 
     if block_type == BlockType.UNORDERED_LIST:
-        lines = content.splitlines()
         items = [line[2:] if line.startswith('- ') else line for line in lines if line.strip().startswith('-')]
         if not items:
             return None
@@ -183,41 +331,108 @@ def block_node_to_html_node(block_type, content):
         return ParentNode("ul", li_nodes)
 
     if block_type == BlockType.ORDERED_LIST:
-        lines = content.splitlines()
-        items = [re.sub(r'^\d+\. ', '', line).strip() for line in lines if re.match(r'^\d+\. ', line)]
+        items = []
+        for line in lines:
+            match = ORDERED_ITEM_PATTERN.match(line)
+            if match:
+                items.append(line[match.end():].strip())
         if not items:
             return None
         li_nodes = [ParentNode('li', text_to_children(item)) for item in items]
         return ParentNode("ol", li_nodes)
 
     if block_type == BlockType.PARAGRAPH:
-        content = ' '.join(content.split('\n'))
+        content = ' '.join(lines)
         return ParentNode("p", text_to_children(content.strip()))
 
     raise ValueError("Unsupported block type")
 
 def extract_title(markdown):
-    lines = markdown.split('\n')
+    return extract_title_from_lines(markdown.split('\n'))
+
+def extract_title_from_lines(lines):
     for line in lines:
         if line.startswith('# '):
-            return line[2:]
+            return line[2:].rstrip('\n')
     raise Exception("No title found in markdown")
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, 'r') as markdown_file:
-        markdown = markdown_file.read()
-    with open(template_path, 'r') as template_file:
-        template = template_file.read()
-    html_string = markdown_to_html_node(markdown).to_html()
+def iter_markdown_html(lines, cache=None):
+    # Same output as markdown_to_html_node(...).iter_html(), built one block at a time
+    yield "<div>"
+    for block_lines in scan_blocks(lines):
+        html_block = lines_to_html_node(block_lines_to_block_type(block_lines), block_lines, cache)
+        if html_block is not None:
+            yield from html_block.iter_html()
+    yield "</div>"
+
+# Sources at least this large are rendered block by block instead of being loaded whole
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+def generate_page(from_path, template_path, dest_path, basepath, log=info, profile=None):
+    log(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if os.path.getsize(from_path) >= STREAMING_THRESHOLD:
+        return generate_page_streaming(from_path, template_path, dest_path, basepath, profile or NULL_PROFILE)
+    if profile is not None:
+        return generate_page_profiled(from_path, template_path, dest_path, basepath, profile)
+    markdown = read_text(from_path)
+    template = load_template(template_path, basepath)
+    cache = active_block_cache()
+    html_node = markdown_to_html_node(markdown, cache=cache)
     title = extract_title(markdown)
 
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html_string)
-    template = template.replace("href=\"/", f"href=\"{basepath}")
-    template = template.replace("src=\"/", f"src=\"{basepath}")
+    with active_output().open_text(dest_path) as dest_file:
+        template.write(dest_file, {
+            "Title": title,
+            "Content": (rewrite_urls(chunk, basepath) for chunk in html_node.iter_html()),
+        })
+    if cache is not None:
+        cache.flush()
+
+def render_page(markdown, template_path, basepath, profile=NULL_PROFILE):
+    with profile.stage("template"):
+        template = load_template(template_path, basepath)
+    cache = active_block_cache()
+    html_node = markdown_to_html_node(markdown, profile, cache)
+    with profile.stage("serialize"):
+        chunks = [rewrite_urls(chunk, basepath) for chunk in html_node.iter_html()]
+    with profile.stage("template"):
+        page = template.render({"Title": extract_title(markdown), "Content": chunks})
+    if cache is not None:
+        cache.flush()
+    return page
+
+def write_page(dest_path, page):
+    with active_output().open_text(dest_path) as dest_file:
+        dest_file.write(page)
+
+def generate_page_profiled(from_path, template_path, dest_path, basepath, profile):
+    # Same steps as generate_page, but each one runs to completion so its time can be measured on its own
+    with profile.stage("read"):
+        markdown = read_text(from_path)
+    profile.bytes_read = len(markdown.encode())
+    page = render_page(markdown, template_path, basepath, profile)
+    with profile.stage("write"):
+        write_page(dest_path, page)
+    profile.bytes_written = len(page.encode())
+
+def generate_page_streaming(from_path, template_path, dest_path, basepath, profile=NULL_PROFILE):
+    # The title is needed before the content, so it is found with a cheap first pass over the file
+    with profile.stage("read"):
+        title = read_markdown_title(from_path)
+    if title is None:
+        raise Exception("No title found in markdown")
+    with profile.stage("template"):
+        template = load_template(template_path, basepath)
+    cache = active_block_cache()
 
-    if not os.path.exists(os.path.dirname(dest_path)):
-        mkdir(os.path.dirname(dest_path))
-    with open(dest_path, 'w') as dest_file:
-        dest_file.write(template)
+    # Parsing and writing interleave here, so a profile can only time them together
+    with profile.stage("stream"), open(from_path, 'r') as markdown_file, active_output().open_text(dest_path) as dest_file:
+        template.write(dest_file, {
+            "Title": title,
+            "Content": (rewrite_urls(chunk, basepath) for chunk in iter_markdown_html(markdown_file, cache)),
+        })
+    if cache is not None:
+        cache.flush()
+    if profile is not NULL_PROFILE:
+        profile.bytes_read = os.path.getsize(from_path)
+        profile.bytes_written = active_output().size(dest_path)